@@ -0,0 +1,351 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:  # Optional: only needed for the asyncio engine
+    aiohttp = None
+
+from pdf_downloader import PDFDownloader, IncompleteDownloadError
+from http_session import DEFAULT_USER_AGENT
+from rate_limiter import BACKOFF_STATUSES, retry_after_seconds
+
+
+class AsyncPDFDownloader(PDFDownloader):
+    """Downloads a stream of known PDF URLs with asyncio, hundreds at a time.
+
+    Filenames, the content store, PDF validation, resumable partial files,
+    revalidation against the ledger and listeners work as in PDFDownloader.
+    Transfers are capped overall (`concurrency`) and per host (`per_host`),
+    requests are paced by the rate limiter, and backoff waits on the event
+    loop instead of blocking a thread. Ledger, store and listener calls run
+    in worker threads so they don't hold up the other transfers, as do
+    segmented downloads of large files. No browser is involved.
+    """
+
+    def __init__(self, download_dir="downloads", ledger=None, concurrency=200, per_host=16,
+                 max_retries=3, retry_delay=5, timeout=30, metrics=None, rate_limiter=None,
+                 chunk_size=64 * 1024, buffer_size=1024 * 1024, layout='flat', segment_threshold=None,
+                 segments=4):
+        """Initialize the downloader; the aiohttp session is opened by download_all()."""
+        if aiohttp is None:
+            raise RuntimeError("The asyncio downloader needs aiohttp: pip install aiohttp")
+        super().__init__(None, download_dir, None, ledger, chunk_size=chunk_size,
+                         buffer_size=buffer_size, metrics=metrics, rate_limiter=rate_limiter,
+                         layout=layout, segment_threshold=segment_threshold, segments=segments)
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.succeeded = 0
+        self.failed = 0
+
+    def run(self, jobs):
+        """Download every job and return (succeeded, failed); see download_all()."""
+        return asyncio.run(self.download_all(jobs))
+
+    async def download_all(self, jobs):
+        """Download (url, title) or (url, title, article_url) jobs from an iterable or async iterable.
+
+        Jobs are read only as fast as they are downloaded, so the stream can
+        be arbitrarily long.
+        """
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        # PDFs are already compressed, and byte ranges must match the bytes we store
+        headers = {'User-Agent': DEFAULT_USER_AGENT, 'Accept-Encoding': 'identity'}
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        # URL -> future of the download in flight, which duplicate jobs wait for
+        self._in_progress = {}
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            workers = [asyncio.create_task(self._worker(session, queue)) for _ in range(self.concurrency)]
+            try:
+                if hasattr(jobs, '__aiter__'):
+                    async for job in jobs:
+                        await queue.put(job)
+                else:
+                    for job in jobs:
+                        await queue.put(job)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+
+        print(f"Downloads finished: {self.succeeded} succeeded, {self.failed} failed")
+        return self.succeeded, self.failed
+
+    async def _worker(self, session, queue):
+        """Take jobs off the queue until the end marker."""
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            url, title = job[0], job[1]
+            article_url = job[2] if len(job) > 2 else None
+            try:
+                ok = await self.download(session, url, title, article_url)
+            except Exception as e:
+                print(f"Error in background download: {e}")
+                ok = False
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    async def download(self, session, url, title, article_url=None):
+        """Download one PDF, record it in the ledger and tell the listeners. Returns True on success."""
+        # Attempts at the same URL share the partial file, so run them once; a duplicate gets the
+        # outcome of the download in flight, which is recorded and reported once
+        in_flight = self._in_progress.get(url)
+        if in_flight is not None:
+            print(f"Already downloading {url}, waiting for it")
+            return await asyncio.shield(in_flight)
+
+        done = asyncio.get_running_loop().create_future()
+        self._in_progress[url] = done
+        ok = False
+        try:
+            ok = await self._download(session, url, title, article_url)
+            return ok
+        finally:
+            del self._in_progress[url]
+            done.set_result(ok)
+
+    async def _download(self, session, url, title, article_url):
+        """Body of download(), run once per URL at a time."""
+        title = self._sanitize_filename(title)
+        previous = await asyncio.to_thread(self.ledger.get_download, url) if self.ledger is not None else None
+        filepath = await asyncio.to_thread(self.layout.path_for, url, self._target_filename(url, title),
+                                           article_url)
+        started = time.monotonic()
+        result = await self._fetch_pdf_async(session, url, filepath, previous)
+        seconds = time.monotonic() - started
+
+        self.metrics.record('download', seconds)
+        self.metrics.count('pdfs_ok' if result else 'pdfs_failed')
+        if self.ledger is not None:
+            if result:
+                await asyncio.to_thread(self.ledger.record_download, url, article_url, 'done',
+                                        result['path'], result['size'], result['sha256'],
+                                        etag=result['etag'], last_modified=result['last_modified'])
+            else:
+                await asyncio.to_thread(self.ledger.record_download, url, article_url, 'failed',
+                                        error="download failed")
+
+        await asyncio.to_thread(self._notify, {'pdf_url': url, 'article_url': article_url, 'title': title,
+                      'status': 'done' if result else 'failed',
+                      'path': result['path'] if result else None,
+                      'size': result['size'] if result else None,
+                      'sha256': result['sha256'] if result else None,
+                      'download_s': round(seconds, 3)})
+        return bool(result)
+
+    async def _wait_turn(self, url):
+        """Wait on the event loop until the rate limiter lets a request to the host through."""
+        delay = self.rate_limiter.reserve(url)
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self.rate_limiter.reserve(url)
+
+    async def _remote_size_matches_async(self, session, url, size):
+        """The asyncio counterpart of _remote_size_matches."""
+        try:
+            await self._wait_turn(url)
+            async with session.head(url, allow_redirects=True) as response:
+                self.rate_limiter.feedback(url, response.status, retry_after_seconds(response.headers))
+                content_length = response.headers.get('Content-Length')
+                return (response.status == 200 and content_length is not None
+                        and int(content_length) == size)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            self.rate_limiter.feedback(url, None)
+            return False
+
+    async def _fetch_pdf_async(self, session, url, filepath, previous=None):
+        """The asyncio counterpart of _fetch_pdf.
+
+        Returns a dict with path, size, sha256, etag and last_modified on
+        success and False otherwise.
+        """
+        headers = {}
+        part_path = self.store.partial_path(url)
+
+        # Revalidate a PDF we already have instead of downloading it again
+        stored = previous is not None and previous['status'] == 'done' and self.store.has(previous['sha256'])
+        if stored:
+            if previous['etag']:
+                headers['If-None-Match'] = previous['etag']
+            if previous['last_modified']:
+                headers['If-Modified-Since'] = previous['last_modified']
+            if 'If-None-Match' not in headers and 'If-Modified-Since' not in headers:
+                if await self._remote_size_matches_async(session, url, previous['size']):
+                    return await asyncio.to_thread(self._reuse_stored, previous, filepath)
+
+        for attempt in range(self.max_retries):
+            # Exponential backoff, or longer if the server asks for it
+            wait_time = self.retry_delay * (2 ** attempt)
+            try:
+                print(f"Attempting to download PDF from: {url} (Attempt {attempt + 1}/{self.max_retries})")
+                transfer_started = time.monotonic()
+
+                # Large files go through PDFDownloader's segmented download, in a worker thread
+                probe = None
+                segment_headers = {'Accept-Encoding': 'identity'}
+                if self.segment_threshold and not stored:
+                    probe = await asyncio.to_thread(self._probe_segmentable, url, segment_headers)
+                if probe is not None:
+                    stored_file = await asyncio.to_thread(self._download_segmented, url, segment_headers,
+                                                          part_path, probe)
+                    if not stored_file:
+                        print("Segmented download is not a PDF")
+                        return False
+                    object_path, size, sha256 = stored_file
+                    self.metrics.add_transfer(size, time.monotonic() - transfer_started)
+                    await asyncio.to_thread(self.store.link, object_path, filepath)
+                    print(f"Successfully downloaded PDF to: {filepath}")
+                    return {'path': filepath, 'size': size, 'sha256': sha256,
+                            'etag': probe.headers.get('ETag'),
+                            'last_modified': probe.headers.get('Last-Modified')}
+
+                # Continue a partial download left by an earlier attempt
+                request_headers = dict(headers)
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                if offset:
+                    request_headers['Range'] = f"bytes={offset}-"
+                    validator = self._read_validator(part_path)
+                    if validator:
+                        request_headers['If-Range'] = validator
+
+                await self._wait_turn(url)
+                async with session.get(url, headers=request_headers) as response:
+                    self.rate_limiter.feedback(url, response.status, retry_after_seconds(response.headers))
+
+                    if response.status == 304 and stored:
+                        return await asyncio.to_thread(self._reuse_stored, previous, filepath)
+
+                    if response.status == 416 and offset:
+                        print("Partial download is no longer valid, starting over")
+                        self._discard_partial(part_path)
+                        continue
+
+                    if response.status in (200, 206):
+                        stored_file = await self._stream_to_store_async(response, part_path, offset)
+                        if stored_file:
+                            object_path, size, sha256 = stored_file
+                            received = size - offset if response.status == 206 else size
+                            self.metrics.add_transfer(received, time.monotonic() - transfer_started)
+                            await asyncio.to_thread(self.store.link, object_path, filepath)
+                            print(f"Successfully downloaded PDF to: {filepath}")
+                            return {'path': filepath, 'size': size, 'sha256': sha256,
+                                    'etag': response.headers.get('ETag'),
+                                    'last_modified': response.headers.get('Last-Modified')}
+                        print(f"Response doesn't appear to be a PDF. "
+                              f"Content-Type: {response.headers.get('Content-Type', '')}")
+                        wait_time = self.retry_delay
+                    else:
+                        print(f"Failed to download PDF. Status code: {response.status}")
+                        if response.status not in BACKOFF_STATUSES:
+                            return False
+                        wait_time = max(wait_time, retry_after_seconds(response.headers) or 0)
+
+            except requests.exceptions.RequestException as e:
+                # From a segmented download, whose requests already reported to the rate limiter
+                print(f"Error downloading PDF: {e}")
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, IncompleteDownloadError) as e:
+                print(f"Error downloading PDF: {e or type(e).__name__}")
+                self.rate_limiter.feedback(url, None)
+
+            if attempt < self.max_retries - 1:
+                print(f"Retrying in {wait_time} seconds...")
+                self.metrics.count_retry('download')
+                await asyncio.sleep(wait_time)
+
+        print(f"Maximum retries reached. Could not download PDF from {url}")
+        return False
+
+    async def _stream_to_store_async(self, response, part_path, offset=0):
+        """The asyncio counterpart of _stream_to_store: returns (object_path, size, sha256) or None."""
+        content_type = response.headers.get('Content-Type', '').lower()
+        chunks = response.content.iter_chunked(self.chunk_size)
+        digest = hashlib.sha256()
+
+        if response.status == 206 and offset:
+            content_range = response.headers.get('Content-Range', '')
+            match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', content_range)
+            if not match or int(match.group(1)) != offset:
+                self._discard_partial(part_path)
+                raise IncompleteDownloadError(f"Unexpected Content-Range: {content_range}")
+            expected = match.group(2)
+
+            head = await asyncio.to_thread(self._hash_partial, part_path, digest)
+            print(f"Resuming download at byte {offset}")
+            mode, size = 'ab', offset
+        else:
+            head = b''
+            async for chunk in chunks:
+                head += chunk
+                if len(head) >= 4:
+                    break
+            expected = None
+            if 'Content-Encoding' not in response.headers:
+                expected = response.headers.get('Content-Length')
+            digest.update(head)
+            mode, size = 'wb', len(head)
+
+        if 'application/pdf' not in content_type and not head.startswith(b'%PDF'):
+            self._discard_partial(part_path)
+            return None
+
+        if mode == 'wb':
+            self._write_validator(part_path, response)
+        # Buffered writes; the disk rarely keeps the loop waiting as long as the network does
+        with open(part_path, mode, buffering=self.buffer_size) as f:
+            if mode == 'wb':
+                f.write(head)
+            async for chunk in chunks:
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+        if expected and expected.isdigit() and size != int(expected):
+            if size > int(expected):
+                self._discard_partial(part_path)
+            raise IncompleteDownloadError(f"Got {size} of {expected} bytes")
+
+        sha256 = digest.hexdigest()
+        return await asyncio.to_thread(self._finish_partial, part_path, sha256), size, sha256
+
+
+def read_jobs(path):
+    """Yield (url, title) jobs from a file: "url<TAB>title" lines, or JSON lines such as manifest.jsonl."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                url = record.get('pdf_url') or record.get('url')
+                if not url:
+                    continue
+                yield url, record.get('title') or _title_from_url(url), record.get('article_url')
+            else:
+                url, _, title = line.partition('\t')
+                yield url, title.strip() or _title_from_url(url)
+
+
+def _title_from_url(url):
+    """Use the last path segment, without .pdf, as the title."""
+    name = os.path.basename(urlsplit(url).path)
+    return re.sub(r'\.pdf$', '', name, flags=re.IGNORECASE) or 'download'
@@ -0,0 +1,79 @@
+"""Compare page-load time and memory per tab for the default and lean browser profiles.
+
+Usage:
+    python benchmarks/browser_profile_benchmark.py --url "https://www.lcgdbzz.org/custom/showZNGS"
+    python benchmarks/browser_profile_benchmark.py --url LIST_URL --url ARTICLE_URL --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+
+from browser_profile import PROFILES, build_chrome_options, apply_profile, ready_states
+from readiness import PageReadiness
+
+
+def measure_profile(profile, urls, repeat, headless=True):
+    """Load each URL `repeat` times in a fresh browser and collect timings and memory."""
+    driver = webdriver.Chrome(options=build_chrome_options(profile, headless))
+    try:
+        apply_profile(driver, profile)
+        driver.execute_cdp_cmd("Performance.enable", {})
+        readiness = PageReadiness(driver, ready_states=ready_states(profile))
+
+        load_times = []
+        heap_sizes = []
+        for _ in range(repeat):
+            for url in urls:
+                started = time.monotonic()
+                driver.get(url)
+                readiness.document_ready('benchmark')
+                load_times.append(time.monotonic() - started)
+
+                metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+                values = {metric["name"]: metric["value"] for metric in metrics}
+                heap_sizes.append(values.get("JSHeapUsedSize", 0) / (1024 * 1024))
+
+        return {
+            'profile': profile,
+            'loads': len(load_times),
+            'load_p50_s': statistics.median(load_times),
+            'load_max_s': max(load_times),
+            'heap_mb_p50': statistics.median(heap_sizes),
+            'heap_mb_max': max(heap_sizes),
+        }
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the default and lean browser profiles.')
+    parser.add_argument('--url', action='append', required=True,
+                        help='Page to load (repeat for several pages)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='How many times to load each page per profile')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON')
+    args = parser.parse_args()
+
+    results = [measure_profile(profile, args.url, args.repeat) for profile in PROFILES]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'profile':<10}{'loads':>7}{'p50 load':>11}{'max load':>11}{'p50 heap':>11}{'max heap':>11}")
+    for result in results:
+        print(f"{result['profile']:<10}{result['loads']:>7}"
+              f"{result['load_p50_s']:>10.2f}s{result['load_max_s']:>10.2f}s"
+              f"{result['heap_mb_p50']:>9.1f}MB{result['heap_mb_max']:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
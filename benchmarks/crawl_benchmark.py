@@ -0,0 +1,136 @@
+"""Measure pages/min, articles/min and MB/s for each crawl mode against the local mock site.
+
+Nothing leaves the machine, so runs are repeatable and can gate changes:
+save a baseline once, then compare later runs against it.
+
+Usage:
+    python benchmarks/crawl_benchmark.py --mode http
+    python benchmarks/crawl_benchmark.py --pages 10 --pdf-kb 1024 --latency 0.05 --save baseline.json
+    python benchmarks/crawl_benchmark.py --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_site import MockJournalSite
+
+MODES = ('http', 'browser', 'parallel')
+# Higher is better for all of these
+RATES = ('pages_per_min', 'articles_per_min', 'mb_per_s')
+
+
+def build_crawler(mode, site, download_dir, download_workers, browsers):
+    """Create the crawler for a mode, pointed at the mock site."""
+    if mode == 'http':
+        from http_crawler import HTTPGuidanceCrawler
+        return HTTPGuidanceCrawler(site.base_url, download_dir, download_workers=download_workers,
+                                   page_url_template=site.page_url_template)
+    if mode == 'browser':
+        from main_crawler import GuidanceCrawler
+        return GuidanceCrawler(site.base_url, download_dir, download_workers=download_workers)
+    from parallel_crawler import ParallelCrawler
+    return ParallelCrawler(site.base_url, download_dir, browsers=browsers,
+                           download_workers=download_workers)
+
+
+def run_mode(mode, site, download_workers=4, browsers=2, verbose=False):
+    """Crawl the whole mock site once in a fresh folder and return the rates."""
+    site.reset_stats()
+    with tempfile.TemporaryDirectory(prefix=f"crawl-bench-{mode}-") as download_dir, \
+            open(os.devnull, 'w') as devnull:
+        with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(devnull):
+            crawler = build_crawler(mode, site, download_dir, download_workers, browsers)
+            started = time.monotonic()
+            crawler.start()
+            elapsed = time.monotonic() - started
+
+    stats = dict(site.stats)
+    minutes = elapsed / 60
+    return {
+        'mode': mode,
+        'elapsed_s': round(elapsed, 3),
+        'pages_per_min': round(stats['list_pages'] / minutes, 1),
+        'articles_per_min': round(stats['articles'] / minutes, 1),
+        'mb_per_s': round(stats['pdf_bytes'] / (1024 * 1024) / elapsed, 2),
+        'server': stats,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a message for every rate that fell more than `tolerance` below the baseline."""
+    previous = {result['mode']: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result['mode'])
+        if not before:
+            continue
+        for rate in RATES:
+            if before[rate] and result[rate] < before[rate] * (1 - tolerance):
+                regressions.append(f"{result['mode']}: {rate} {result[rate]} < baseline {before[rate]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the crawl modes against a local mock site.')
+    parser.add_argument('--mode', action='append', choices=MODES,
+                        help='Crawl mode to run (repeat for several; default: all)')
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--articles-per-page', type=int, default=10)
+    parser.add_argument('--pdf-kb', type=int, default=256, help='Size of each PDF in KB')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--download-workers', type=int, default=4)
+    parser.add_argument('--browsers', type=int, default=2, help='Browser processes for the parallel mode')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown against the baseline (0.2 = 20%%)')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    parser.add_argument('--verbose', action='store_true', help='Show the crawler output')
+    args = parser.parse_args()
+
+    site = MockJournalSite(args.pages, args.articles_per_page, args.pdf_kb * 1024, args.latency,
+                           args.error_rate, args.throttle_rate).start()
+    results = []
+    try:
+        for mode in args.mode or MODES:
+            try:
+                results.append(run_mode(mode, site, args.download_workers, args.browsers, args.verbose))
+            except Exception as e:
+                # Browser modes need Selenium and Chrome; report and go on with the others
+                print(f"Skipping {mode}: {e}")
+    finally:
+        site.stop()
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'mode':<10}{'time':>9}{'pages/min':>12}{'articles/min':>14}{'MB/s':>9}{'errors':>8}{'429s':>6}")
+        for result in results:
+            print(f"{result['mode']:<10}{result['elapsed_s']:>8.1f}s{result['pages_per_min']:>12.1f}"
+                  f"{result['articles_per_min']:>14.1f}{result['mb_per_s']:>9.2f}"
+                  f"{result['server']['errors']:>8}{result['server']['throttled']:>6}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
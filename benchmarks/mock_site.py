@@ -0,0 +1,321 @@
+"""A local stand-in for the journal site, for benchmarks that must not touch the live server.
+
+It serves the same structure the crawlers read: list pages with
+`#topdownlist li.listp a` links, a `.pageTagLiInfo.info.gong` page count,
+`li.clickpage` pager buttons and a gotopage() that loads the list over XHR;
+article pages with `#fileurls` and downpdfbyname(...) links; and PDFs of a
+configurable size with ETag and Range support. Latency, server errors and
+429 responses can be injected to see how the crawlers cope.
+
+Usage:
+    python benchmarks/mock_site.py --pages 5 --articles-per-page 10 --pdf-kb 256
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+LIST_PATH = "/custom/showZNGS"
+FRAGMENT_PATH = "/custom/listFragment"
+ARTICLE_PATH = "/custom/article/"
+FILE_URL_PREFIX = "/fileLCGDBZZ/"
+PDF_PATH = "cms/news/info/"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script>
+function gotopage(page) {{
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', '{fragment_path}');
+    xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded; charset=UTF-8');
+    xhr.onload = function () {{ document.getElementById('listcontent').innerHTML = xhr.responseText; }};
+    xhr.send('columnId=ZNGS&page=' + page);
+}}
+function downpdfbyname(path, name) {{
+    window.location.href = document.getElementById('fileurls').value + path;
+}}
+</script></head>
+<body>{body}</body></html>
+"""
+
+
+class MockJournalSite:
+    """Serves a fake journal on 127.0.0.1 in a background thread."""
+
+    def __init__(self, pages=5, articles_per_page=10, pdf_size=256 * 1024, latency=0.0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=0, port=0):
+        """Configure the site; nothing is served until start()."""
+        self.pages = pages
+        self.articles_per_page = articles_per_page
+        self.pdf_size = pdf_size
+        # Seconds added to every response
+        self.latency = latency
+        # Fractions of requests answered with 500 and with 429 (+ Retry-After)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.port = port
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self.stats = {}
+        self.reset_stats()
+
+    @property
+    def base_url(self):
+        """Address of the first list page."""
+        return f"http://127.0.0.1:{self.port}{LIST_PATH}"
+
+    @property
+    def page_url_template(self):
+        """List page URL with a {page} placeholder, for the HTTP engine."""
+        return f"http://127.0.0.1:{self.port}{LIST_PATH}?page={{page}}"
+
+    def start(self):
+        """Start serving and return self."""
+        site = self
+
+        class Handler(_MockHandler):
+            pass
+        Handler.site = site
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, name="mock-site", daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_stats(self):
+        """Zero the request counters."""
+        with self._lock:
+            self.stats = {'list_pages': 0, 'articles': 0, 'pdf_requests': 0, 'pdf_bytes': 0,
+                          'errors': 0, 'throttled': 0}
+
+    def count(self, name, amount=1):
+        """Increase one of the request counters."""
+        with self._lock:
+            self.stats[name] += amount
+
+    def injected_failure(self):
+        """Return 500, 429 or None for the next request, using the seeded generator."""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return 500
+        if roll < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+    def article_title(self, number):
+        """Title of an article."""
+        return f"指南 {number:04d}：模拟文章"
+
+    def pdf_body(self, number):
+        """Bytes of an article's PDF; distinct per article so the store can't dedupe them."""
+        header = b'%PDF-1.4\n%% mock article ' + str(number).encode() + b'\n'
+        return header.ljust(max(self.pdf_size, len(header)), b'\0')
+
+    def list_markup(self, page):
+        """The #listcontent part of a list page: article links and the pager."""
+        first = (page - 1) * self.articles_per_page + 1
+        items = ''.join(
+            f'<li class="listp"><a href="{ARTICLE_PATH}{number}">{self.article_title(number)}</a>'
+            f'<span class="date">2025-01-01</span></li>'
+            for number in range(first, first + self.articles_per_page))
+        next_click = f' onclick="gotopage({page + 1})"' if page < self.pages else ''
+        prev_click = f' onclick="gotopage({page - 1})"' if page > 1 else ''
+        pager = (f'<ul class="pager">'
+                 f'<li class="clickpage first" onclick="gotopage(1)">首页</li>'
+                 f'<li class="clickpage prev"{prev_click}>上一页</li>'
+                 f'<li class="clickpage current">{page}</li>'
+                 f'<li class="clickpage next"{next_click}>下一页</li>'
+                 f'<li class="clickpage last" onclick="gotopage({self.pages})">尾页</li>'
+                 f'<li class="pageTagLiInfo info gong">共{self.pages}页</li></ul>')
+        return f'<div id="topdownlist"><ul>{items}</ul></div>{pager}'
+
+    def list_page(self, page):
+        """A full list page."""
+        body = f'<div id="listcontent">{self.list_markup(page)}</div>'
+        return PAGE_TEMPLATE.format(title=f"指南共识 - 第{page}页", fragment_path=FRAGMENT_PATH, body=body)
+
+    def article_page(self, number):
+        """An article page with the file prefix and a downpdfbyname link."""
+        title = self.article_title(number)
+        body = (f'<h1>{title}</h1>'
+                f'<input type="hidden" id="fileurls" value="{FILE_URL_PREFIX}">'
+                f'<a href="javascript:void(0)" onclick="downpdfbyname(\'{PDF_PATH}{number}.pdf\',\'{title}\')">'
+                f'PDF下载</a>')
+        return PAGE_TEMPLATE.format(title=title, fragment_path=FRAGMENT_PATH, body=body)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    site = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8', 'replace'))
+        if urlsplit(self.path).path != FRAGMENT_PATH:
+            return self._send_text(404, "Not found")
+        if self._inject():
+            return
+        page = self._page_number(form)
+        if page is None:
+            return self._send_text(404, "No such page")
+        self.site.count('list_pages')
+        self._send_text(200, self.site.list_markup(page), 'text/html; charset=utf-8')
+
+    def _handle(self, send_body):
+        site = self.site
+        parts = urlsplit(self.path)
+        if self._inject():
+            return
+
+        if parts.path == LIST_PATH:
+            page = self._page_number(parse_qs(parts.query), default=1)
+            if page is None:
+                return self._send_text(404, "No such page", send_body=send_body)
+            site.count('list_pages')
+            return self._send_text(200, site.list_page(page), 'text/html; charset=utf-8', send_body)
+
+        if parts.path.startswith(ARTICLE_PATH):
+            number = self._article_number(parts.path[len(ARTICLE_PATH):])
+            if number is None:
+                return self._send_text(404, "No such article", send_body=send_body)
+            site.count('articles')
+            return self._send_text(200, site.article_page(number), 'text/html; charset=utf-8', send_body)
+
+        prefix = FILE_URL_PREFIX + PDF_PATH
+        if parts.path.startswith(prefix) and parts.path.endswith('.pdf'):
+            number = self._article_number(parts.path[len(prefix):-len('.pdf')])
+            if number is None:
+                return self._send_text(404, "No such file", send_body=send_body)
+            return self._send_pdf(site.pdf_body(number), number, send_body)
+
+        self._send_text(404, "Not found", send_body=send_body)
+
+    def _inject(self):
+        """Apply the configured latency and failures. Returns True if the request was answered."""
+        if self.site.latency:
+            time.sleep(self.site.latency)
+        status = self.site.injected_failure()
+        if status == 500:
+            self.site.count('errors')
+            self._send_text(500, "Injected error")
+            return True
+        if status == 429:
+            self.site.count('throttled')
+            self._send_text(429, "Too many requests", headers={'Retry-After': str(self.site.retry_after)})
+            return True
+        return False
+
+    def _page_number(self, params, default=None):
+        try:
+            page = int(params.get('page', [default])[0])
+        except (TypeError, ValueError):
+            return None
+        return page if 1 <= page <= self.site.pages else None
+
+    def _article_number(self, text):
+        try:
+            number = int(text)
+        except ValueError:
+            return None
+        return number if 1 <= number <= self.site.pages * self.site.articles_per_page else None
+
+    def _send_text(self, status, text, content_type='text/plain; charset=utf-8', send_body=True,
+                   headers=None):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_pdf(self, body, number, send_body):
+        etag = f'"mock-{number}-{len(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        start, end, status = 0, len(body) - 1, 200
+        range_header = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if range_header.startswith('bytes=') and (not if_range or if_range == etag):
+            first, _, last = range_header[len('bytes='):].partition('-')
+            try:
+                start = int(first)
+                end = min(int(last), end) if last else end
+            except ValueError:
+                start, end = 0, len(body) - 1
+            else:
+                if start >= len(body):
+                    self.send_response(416)
+                    self.send_header('Content-Range', f'bytes */{len(body)}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                status = 206
+
+        part = body[start:end + 1]
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(part)))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', 'Wed, 01 Jan 2025 00:00:00 GMT')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(body)}')
+        self.end_headers()
+        if send_body:
+            self.site.count('pdf_requests')
+            self.wfile.write(part)
+            self.site.count('pdf_bytes', len(part))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local mock of the journal site.')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--articles-per-page', type=int, default=10)
+    parser.add_argument('--pdf-kb', type=int, default=256, help='Size of each PDF in KB')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    site = MockJournalSite(args.pages, args.articles_per_page, args.pdf_kb * 1024, args.latency,
+                           args.error_rate, args.throttle_rate, port=args.port).start()
+    print(f"Serving mock journal at {site.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+
+from selenium.webdriver.chrome.options import Options
+
+PROFILES = ('default', 'lean')
+
+# Requests the crawler never needs: images, stylesheets, fonts and analytics
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.css",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hm.baidu.com*", "*cnzz.com*", "*51.la*",
+]
+
+
+def build_chrome_options(profile='default', headless=True, debugger_address=None, user_data_dir=None):
+    """Return Chrome options for a browser profile ('default' or 'lean').
+
+    With `debugger_address` ("host:port") the driver attaches to a Chrome
+    already running with --remote-debugging-port instead of launching one;
+    `user_data_dir` keeps cookies and the HTTP cache between runs.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile: {profile}")
+
+    chrome_options = Options()
+    if profile == 'lean':
+        # Hand pages over at DOMContentLoaded instead of waiting for every subresource
+        chrome_options.page_load_strategy = 'eager'
+    if debugger_address:
+        # Launch flags and prefs belong to whoever started that Chrome
+        chrome_options.add_experimental_option("debuggerAddress", debugger_address)
+        return chrome_options
+
+    if user_data_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-gpu")
+
+    if profile == 'lean':
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    return chrome_options
+
+
+def apply_profile(driver, profile='default'):
+    """Apply the parts of a profile that need a running browser (CDP request blocking)."""
+    if profile != 'lean':
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        # Only Chromium drivers speak CDP; image blocking via prefs still applies
+        print(f"Could not enable request blocking: {e}")
+
+
+def ready_states(profile='default'):
+    """Return the document.readyState values that count as loaded for a profile."""
+    return ('interactive', 'complete') if profile == 'lean' else ('complete',)
@@ -0,0 +1,57 @@
+import os
+import hashlib
+import shutil
+
+OBJECTS_DIRNAME = ".objects"
+
+
+class ContentStore:
+    """Content-addressed PDF store: each unique file is kept once under its SHA-256."""
+
+    def __init__(self, download_dir="downloads", dirname=OBJECTS_DIRNAME):
+        """Initialize the store inside the download directory."""
+        self.root = os.path.join(download_dir, dirname)
+        # Temp files live next to the objects so the final rename is atomic
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def object_path(self, sha256):
+        """Return where the object with the given hash is stored."""
+        return os.path.join(self.root, sha256[:2], f"{sha256}.pdf")
+
+    def has(self, sha256):
+        """Check whether an object with the given hash is stored."""
+        return bool(sha256) and os.path.exists(self.object_path(sha256))
+
+    def partial_path(self, url):
+        """Return the stable partial-file path for a download, so it can be resumed."""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.tmp_dir, f"{key}.part")
+
+    def add(self, temp_path, sha256):
+        """Move a finished download into the store, dropping it if it is a duplicate."""
+        object_path = self.object_path(sha256)
+        if os.path.exists(object_path):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(temp_path, object_path)
+        return object_path
+
+    def link(self, object_path, dest_path):
+        """Expose a stored object under a readable name (hardlink, else symlink, else copy)."""
+        if os.path.exists(dest_path) and os.path.samefile(dest_path, object_path):
+            return dest_path
+
+        tmp_link = f"{dest_path}.link"
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        try:
+            os.link(object_path, tmp_link)
+        except OSError:
+            try:
+                os.symlink(os.path.abspath(object_path), tmp_link)
+            except OSError:
+                shutil.copyfile(object_path, tmp_link)
+        os.replace(tmp_link, dest_path)
+        return dest_path
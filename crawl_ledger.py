@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import threading
+import time
+
+LEDGER_FILENAME = "crawl_ledger.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    links INTEGER,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    page INTEGER,
+    pdf_url TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    published TEXT,
+    category TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS downloads (
+    pdf_url TEXT PRIMARY KEY,
+    article_url TEXT,
+    path TEXT,
+    size INTEGER,
+    sha256 TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns added after the first release, as (table, column, type)
+MIGRATIONS = [
+    ("downloads", "etag", "TEXT"),
+    ("downloads", "last_modified", "TEXT"),
+    ("articles", "published", "TEXT"),
+    ("articles", "category", "TEXT"),
+]
+
+
+class CrawlLedger:
+    """SQLite record of crawled pages, articles and downloads, kept in the download dir."""
+
+    def __init__(self, download_dir="downloads", filename=LEDGER_FILENAME):
+        """Open (or create) the ledger."""
+        if not os.path.exists(download_dir):
+            os.makedirs(download_dir)
+
+        self.path = os.path.join(download_dir, filename)
+        self._lock = threading.Lock()
+        # Shared between the browser thread and the download workers
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.commit()
+
+    def _migrate(self):
+        """Add columns that ledgers created by older versions are missing."""
+        for table, column, column_type in MIGRATIONS:
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _execute(self, sql, params=()):
+        """Run a write statement and commit it."""
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def _query(self, sql, params=()):
+        """Run a read statement and return all rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query_dicts(self, sql, params=()):
+        """Run a read statement and return all rows as dicts."""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    # Settings learned during earlier runs
+
+    def get_meta(self, key):
+        """Return a stored value, or None."""
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key, value):
+        """Store a value under a key."""
+        self._execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                      "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (key, value))
+
+    # Pages
+
+    def mark_page(self, page, status, links=None):
+        """Record the status of a list page ('visited' or 'failed')."""
+        self._execute(
+            "INSERT INTO pages (page, status, links, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(page) DO UPDATE SET status=excluded.status, "
+            "links=COALESCE(excluded.links, pages.links), updated_at=excluded.updated_at",
+            (page, status, links, time.time()))
+
+    def first_unvisited_page(self, start_page, total_pages):
+        """Return the first page from start_page on that was not fully visited."""
+        visited = {row[0] for row in self._query(
+            "SELECT page FROM pages WHERE status = 'visited' AND page >= ?", (start_page,))}
+        page = start_page
+        while page in visited and page < total_pages:
+            page += 1
+        return page
+
+    # Articles
+
+    def record_article(self, url, title, page, status='seen', published=None, category=None):
+        """Record that an article link was seen on a list page, with its list metadata."""
+        self._execute(
+            "INSERT INTO articles (url, title, page, status, published, category, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET title=excluded.title, page=excluded.page, "
+            "published=COALESCE(excluded.published, articles.published), "
+            "category=COALESCE(excluded.category, articles.category), "
+            "updated_at=excluded.updated_at",
+            (url, title, page, status, published, category, time.time()))
+
+    def update_article(self, url, status, pdf_url=None, error=None):
+        """Update the status (and resolved PDF URL) of an article."""
+        self._execute(
+            "UPDATE articles SET status = ?, pdf_url = COALESCE(?, pdf_url), error = ?, "
+            "updated_at = ? WHERE url = ?",
+            (status, pdf_url, error, time.time(), url))
+
+    def get_article(self, url):
+        """Return the ledger row for an article URL as a dict, or None."""
+        rows = self._query_dicts("SELECT * FROM articles WHERE url = ?", (url,))
+        return rows[0] if rows else None
+
+    def known_articles(self, urls):
+        """Return the subset of article URLs whose PDFs were already downloaded."""
+        urls = list(urls)
+        known = set()
+        # Stay well below SQLite's limit on bound parameters
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            known.update(row[0] for row in self._query(
+                f"SELECT url FROM articles WHERE status = 'done' AND url IN ({placeholders})",
+                chunk))
+        return known
+
+    def failed_articles(self, first_page=1, last_page=None):
+        """Return (url, title, page) of unfinished articles on pages already visited."""
+        return self._query(
+            "SELECT a.url, a.title, a.page FROM articles a JOIN pages p ON a.page = p.page "
+            "WHERE p.status = 'visited' AND a.status != 'done' AND a.page >= ? "
+            "AND (? IS NULL OR a.page <= ?) ORDER BY a.page, a.url",
+            (first_page, last_page, last_page))
+
+    # Downloads
+
+    def record_download(self, pdf_url, article_url, status, path=None, size=None, sha256=None,
+                        error=None, etag=None, last_modified=None):
+        """Record the outcome of a PDF download and update its article."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO downloads (pdf_url, article_url, path, size, sha256, etag, "
+                "last_modified, status, error, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(pdf_url) DO UPDATE SET "
+                "article_url=COALESCE(downloads.article_url, excluded.article_url), "
+                "path=COALESCE(excluded.path, downloads.path), "
+                "size=COALESCE(excluded.size, downloads.size), "
+                "sha256=COALESCE(excluded.sha256, downloads.sha256), "
+                "etag=COALESCE(excluded.etag, downloads.etag), "
+                "last_modified=COALESCE(excluded.last_modified, downloads.last_modified), "
+                "status=excluded.status, error=excluded.error, updated_at=excluded.updated_at",
+                (pdf_url, article_url, path, size, sha256, etag, last_modified, status, error,
+                 now))
+            if article_url:
+                # An article with several PDFs is done only once all of them are downloaded. A PDF
+                # shared by two articles belongs to the first; both are updated
+                self._conn.execute(
+                    "UPDATE articles SET status = CASE "
+                    "WHEN ? = 'failed' OR EXISTS (SELECT 1 FROM downloads "
+                    "WHERE downloads.article_url = articles.url AND downloads.status = 'failed') "
+                    "THEN 'failed' "
+                    "WHEN EXISTS (SELECT 1 FROM downloads "
+                    "WHERE downloads.article_url = articles.url AND downloads.status != 'done') "
+                    "THEN 'resolved' ELSE 'done' END, "
+                    "pdf_url = ?, error = ?, updated_at = ? "
+                    "WHERE url IN (?, (SELECT article_url FROM downloads WHERE pdf_url = ?))",
+                    (status, pdf_url, error, now, article_url, pdf_url))
+            self._conn.commit()
+
+    def queue_downloads(self, pdf_urls, article_url):
+        """Record every PDF resolved for an article before any of them is downloaded."""
+        with self._lock:
+            now = time.time()
+            # Earlier outcomes are kept; a done row is what the next download revalidates. A PDF
+            # that another article queued first stays with that article
+            self._conn.executemany(
+                "INSERT INTO downloads (pdf_url, article_url, status, updated_at) "
+                "VALUES (?, ?, 'queued', ?) ON CONFLICT(pdf_url) DO UPDATE SET "
+                "article_url=COALESCE(downloads.article_url, excluded.article_url)",
+                [(pdf_url, article_url, now) for pdf_url in pdf_urls])
+            self._conn.execute(
+                "UPDATE articles SET status = 'resolved', pdf_url = ?, error = NULL, updated_at = ? "
+                "WHERE url = ?", (pdf_urls[0], now, article_url))
+            self._conn.commit()
+
+    def get_download(self, pdf_url):
+        """Return the ledger row for a PDF URL as a dict, or None."""
+        rows = self._query_dicts("SELECT * FROM downloads WHERE pdf_url = ?", (pdf_url,))
+        return rows[0] if rows else None
+
+    def download_paths(self):
+        """Return (pdf_url, path) for every download that has a local file."""
+        return self._query("SELECT pdf_url, path FROM downloads WHERE path IS NOT NULL")
+
+    def downloaded_documents(self):
+        """Return every finished download with its article's title and page, as dicts."""
+        return self._query_dicts(
+            "SELECT d.pdf_url, d.article_url, d.path, d.size, d.sha256, a.title, a.page "
+            "FROM downloads d LEFT JOIN articles a ON a.url = d.article_url "
+            "WHERE d.status = 'done' ORDER BY a.page, d.pdf_url")
@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DownloadPool:
+    def __init__(self, max_workers=4, max_pending=None):
+        """Initialize a bounded pool of background download workers."""
+        self.max_workers = max(1, max_workers)
+        # Limit how far the browser can run ahead of the downloads
+        self.max_pending = max_pending or self.max_workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="pdf-download")
+        self._lock = threading.Lock()
+        self._futures = set()
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a download job, blocking only if too many jobs are pending."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._run, func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._futures.add(future)
+            self.submitted += 1
+        future.add_done_callback(self._discard)
+        return future
+
+    def _run(self, func, *args, **kwargs):
+        """Run a single job and keep track of its outcome."""
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            print(f"Error in background download: {e}")
+            result = False
+
+        with self._lock:
+            if result:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+        return result
+
+    def _discard(self, future):
+        """Release the slot held by a finished job."""
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    def pending(self):
+        """Return the number of jobs that have not finished yet."""
+        with self._lock:
+            return len(self._futures)
+
+    def drain(self):
+        """Wait for all queued downloads to finish and stop the workers."""
+        pending = self.pending()
+        if pending:
+            print(f"Waiting for {pending} pending downloads to finish...")
+        self._executor.shutdown(wait=True)
+        print(f"Downloads finished: {self.succeeded} succeeded, {self.failed} failed "
+              f"({self.submitted} queued)")
+
+
+class QueueSink:
+    """Stand-in for DownloadPool that forwards download jobs to another process.
+
+    PDFDownloader submits its bound download method, which can't cross a
+    process boundary, so only the (url, title, article_url) arguments are
+    put on the queue for the consuming process to download itself.
+    """
+
+    def __init__(self, queue):
+        """Initialize the sink with a multiprocessing queue."""
+        self.queue = queue
+        self.submitted = 0
+
+    def submit(self, func, url, title, article_url=None):
+        """Forward a download job to the queue."""
+        self.queue.put((url, title, article_url))
+        self.submitted += 1
+
+    def drain(self):
+        """Nothing to wait for; the consumer owns the downloads."""
+        print(f"Handed {self.submitted} downloads to the shared queue")
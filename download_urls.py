@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+
+from async_downloader import AsyncPDFDownloader, read_jobs
+from crawl_ledger import CrawlLedger
+from manifest import CrawlManifest, MANIFEST_FILENAME
+from rate_limiter import RateLimiter
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download a list of known PDF URLs without a browser')
+    parser.add_argument('url_file',
+                        help='File with one "url<TAB>title" per line, or JSON lines such as a manifest.jsonl')
+    parser.add_argument('--download-dir', type=str, default='downloads',
+                        help='Directory to save downloaded PDFs')
+    parser.add_argument('--concurrency', type=int, default=200,
+                        help='Transfers in flight at once')
+    parser.add_argument('--per-host', type=int, default=16,
+                        help='Connections per host')
+    parser.add_argument('--rate', type=float, default=5.0,
+                        help='Requests per second to start with, per host')
+    parser.add_argument('--max-rate', type=float, default=50.0,
+                        help='Upper limit for the request rate while responses stay healthy')
+    parser.add_argument('--segment-threshold', type=int, default=None,
+                        help='Download PDFs of at least this many bytes as parallel byte ranges '
+                             '(default: never)')
+    parser.add_argument('--segments', type=int, default=4,
+                        help='Parallel byte ranges per segmented download')
+    parser.add_argument('--layout', choices=['flat', 'hash', 'date'], default='flat',
+                        help='Where PDFs go: the download folder itself, or subfolders by URL hash or publication month')
+    args = parser.parse_args()
+
+    ledger = CrawlLedger(args.download_dir)
+    try:
+        downloader = AsyncPDFDownloader(args.download_dir, ledger, concurrency=args.concurrency,
+                                        per_host=args.per_host, layout=args.layout,
+                                        segment_threshold=args.segment_threshold, segments=args.segments,
+                                        rate_limiter=RateLimiter(args.rate, max_rate=args.max_rate))
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    manifest = CrawlManifest(os.path.join(args.download_dir, MANIFEST_FILENAME))
+    downloader.add_listener(manifest.write)
+
+    jobs = read_jobs(args.url_file)
+    if os.path.realpath(args.url_file) == os.path.realpath(manifest.path):
+        # This run appends to the same file, so take the earlier records before starting
+        jobs = list(jobs)
+
+    try:
+        downloader.run(jobs)
+    finally:
+        downloader.rate_limiter.report()
+        downloader.metrics.report()
+        manifest.close()
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
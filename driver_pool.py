@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+
+class TabPool:
+    """Owns the browser: a main tab for list pages plus a warm tab reused for every article.
+
+    Articles are loaded in place in the warm tab instead of opening and
+    closing a tab each time. If the browser stops responding, recycle()
+    replaces it with a fresh one from the factory.
+
+    With `attached` (a Chrome the user started, see --debugger-address) the
+    crawler works in tabs of its own instead of the one the user has open,
+    closes them again in close(), and never quits or replaces the browser.
+    """
+
+    def __init__(self, driver_factory, attached=False):
+        """Start a driver and remember its first tab (or a new one, when attached) as the main window."""
+        self.driver_factory = driver_factory
+        self.attached = attached
+        self.driver = None
+        self.main_window = None
+        self.article_window = None
+        self.recycled = 0
+        self._start_driver()
+
+    def _start_driver(self):
+        """Create a driver from the factory and reset the tab handles."""
+        self.driver = self.driver_factory()
+        self.article_window = None
+        if self.attached:
+            self.main_window = self._open_tab()
+            self.driver.switch_to.window(self.main_window)
+        else:
+            self.main_window = self.driver.current_window_handle
+
+    def _open_tab(self):
+        """Open a blank tab and return its handle, staying on the current one."""
+        known = set(self.driver.window_handles)
+        self.driver.execute_script("window.open('about:blank');")
+        new_handles = [handle for handle in self.driver.window_handles if handle not in known]
+        return new_handles[0]
+
+    def _ensure_article_window(self):
+        """Open the warm article tab if it doesn't exist (or was closed)."""
+        if self.article_window not in self.driver.window_handles:
+            self.article_window = self._open_tab()
+        return self.article_window
+
+    @contextmanager
+    def article_tab(self):
+        """Switch to the warm article tab, and back to the main tab afterwards."""
+        self.driver.switch_to.window(self._ensure_article_window())
+        try:
+            yield self.driver
+        finally:
+            try:
+                self.driver.switch_to.window(self.main_window)
+            except WebDriverException as e:
+                # Left to healthy()/recycle() to sort out
+                print(f"Error switching back to the main tab: {e}")
+
+    def healthy(self):
+        """Check that the browser still responds and the main tab is open."""
+        try:
+            self.driver.execute_script("return 1;")
+            return self.main_window in self.driver.window_handles
+        except Exception:
+            return False
+
+    def recycle(self):
+        """Replace a crashed or hung browser with a fresh one and return the new driver."""
+        if self.attached:
+            # Not ours to restart; carry on in fresh tabs if it still responds
+            print("Attached browser is unresponsive or lost its tabs, reopening them...")
+            try:
+                self.main_window = self._open_tab()
+                self.driver.switch_to.window(self.main_window)
+                self.article_window = None
+            except Exception as e:
+                print(f"Could not reopen tabs in the attached browser: {e}")
+            return self.driver
+
+        print("Browser is unresponsive, starting a new one...")
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self._start_driver()
+        self.recycled += 1
+        return self.driver
+
+    def close(self):
+        """Quit the browser, or close our tabs and detach from a browser we attached to."""
+        if self.attached:
+            for handle in (self.article_window, self.main_window):
+                try:
+                    if handle in self.driver.window_handles:
+                        self.driver.switch_to.window(handle)
+                        self.driver.close()
+                except Exception as e:
+                    print(f"Error closing crawler tab: {e}")
+        self.driver.quit()
@@ -0,0 +1,341 @@
+import time
+import os
+import re
+from urllib.parse import urljoin
+
+import requests
+
+from pdf_downloader import PDFDownloader, resolve_pdf_urls
+from page_parsers import ListPageParser, ArticlePageParser
+from download_pool import DownloadPool
+from crawl_ledger import CrawlLedger
+from page_addressing import PageRequestCache
+from metrics import CrawlMetrics
+from rate_limiter import RateLimiter, retry_after_seconds
+from http_session import create_session
+from manifest import ArticleInfo, CrawlManifest, MANIFEST_FILENAME, follow
+from site_profiles import profile_for_url
+
+METRICS_FILENAME = "crawl_metrics.json"
+
+
+class HTTPGuidanceCrawler:
+    def __init__(self, base_url, download_dir='downloads', headless=True, download_workers=4,
+                 page_url_template=None, timeout=15, resume=False, incremental=False,
+                 browser_profile='default', progress_interval=None, rate_limiter=None, site=None,
+                 download_pool=None, debugger_address=None, user_data_dir=None, layout='flat',
+                 segment_threshold=None, segments=4):
+        """Initialize the browserless crawler."""
+        self.base_url = base_url
+        # Selectors and conventions of the site (see site_profiles)
+        self.site = site or profile_for_url(base_url)
+        self.current_page = 1
+        self.total_pages = None
+        self.download_dir = download_dir
+        self.headless = headless
+        self.browser_profile = browser_profile
+        # Passed to the fallback browser
+        self.debugger_address = debugger_address
+        self.user_data_dir = user_data_dir
+        self.timeout = timeout
+        # e.g. "https://example.com/list?page={page}"; without it only page 1 is fetched over HTTP
+        self.page_url_template = page_url_template or self.site.page_url_template
+        # Skip work the ledger already records as done, and retry earlier failures
+        self.resume = resume
+        # Stop paging at the first list page whose articles were all downloaded before
+        self.incremental = incremental
+        self.caught_up = False
+
+        # Create download directory if it doesn't exist
+        if not os.path.exists(download_dir):
+            os.makedirs(download_dir)
+
+        # Paces pages and downloads against the site, shared with the fallback browser
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # A pool passed in (e.g. by MultiSiteCrawler) is shared and drained by its owner; the
+        # rate limiter's adaptive slots decide how many of its workers download at once
+        self._owns_pool = download_pool is None
+        if download_pool is None and download_workers > 0:
+            download_pool = DownloadPool(self.rate_limiter.max_concurrency)
+        self.download_pool = download_pool
+        self.ledger = CrawlLedger(download_dir)
+        self.metrics = CrawlMetrics()
+        self.progress_interval = progress_interval
+
+        # One pooled session with keep-alive for all list pages, article pages and PDF segments
+        downloads = getattr(self.download_pool, 'max_workers', 1) * (segments if segment_threshold else 1)
+        self.session = create_session(downloads + 1)
+        self.pdf_downloader = PDFDownloader(None, download_dir, self.download_pool, self.ledger,
+                                            metrics=self.metrics, rate_limiter=self.rate_limiter,
+                                            session=self.session, site=self.site, layout=layout,
+                                            segment_threshold=segment_threshold, segments=segments)
+
+        # Results as JSONL, one line per article PDF, shared with the fallback browser
+        self.manifest = CrawlManifest(os.path.join(download_dir, MANIFEST_FILENAME))
+        self._article_info = ArticleInfo()
+        self.pdf_downloader.article_info = self._article_info
+        self.pdf_downloader.add_listener(self._record_download)
+
+        # Request behind gotopage(n) learned by an earlier browser run, if any
+        self.page_requests = PageRequestCache(self.ledger, base_url, timeout, self.rate_limiter,
+                                              site=self.site)
+        self.page_requests.session = self.session
+
+        # Selenium crawler used only for pages we can't parse, started on first use
+        self._browser = None
+        self._first_page = None
+
+    def start(self):
+        """Start the crawling process."""
+        try:
+            print(f"Starting HTTP crawler on {self.base_url}")
+            self.metrics.start_progress(self.progress_interval)
+            with self.metrics.phase('list_navigation'):
+                html, _ = self._fetch(self.base_url)
+            if html:
+                self._first_page = self._parse(ListPageParser(self.site), html)
+
+            # Get total pages
+            self.total_pages = self._get_total_pages()
+            print(f"Total pages found: {self.total_pages}")
+            if self._browser is not None:
+                self._browser.total_pages = self.total_pages
+
+            if self.resume:
+                self._retry_failed_articles()
+                resume_page = self.ledger.first_unvisited_page(self.current_page, self.total_pages)
+                if resume_page != self.current_page:
+                    print(f"Resuming from page {resume_page}")
+                    self.current_page = resume_page
+
+            page = self.current_page
+            while page <= self.total_pages and not self.caught_up:
+                self.current_page = page
+                self._process_page(page)
+                page += 1
+        finally:
+            self.rate_limiter.report()
+            if self._browser is not None:
+                self._browser.readiness.report()
+                print("Closing browser...")
+                self._browser.tab_pool.close()
+
+            # A shared pool is drained by its owner, who then calls close()
+            if self._owns_pool:
+                self.close()
+
+    def close(self):
+        """Let queued downloads finish, then write the metrics and close the manifest and ledger."""
+        if self.download_pool is not None and self._owns_pool:
+            self.download_pool.drain()
+        self.metrics.stop_progress()
+        self.metrics.report(os.path.join(self.download_dir, METRICS_FILENAME))
+        self.manifest.close()
+        self.ledger.close()
+
+    def _get_total_pages(self):
+        """Get the total number of pages from the first list page."""
+        if self._first_page is None or not self._first_page.links:
+            print("Could not parse the list page over HTTP, asking the browser")
+            return self._get_browser()._get_total_pages()
+
+        match = re.search(r'\d+', self._first_page.page_info_text or '')
+        if match:
+            return int(match.group())
+        print("Pagination element not found, assuming 1 page")
+        return 1
+
+    def _fetch(self, url, max_retries=3, retry_delay=5):
+        """Fetch a page and return its decoded HTML and final URL."""
+        retry_count = 0
+        while retry_count < max_retries:
+            retry_after = None
+            self.rate_limiter.wait(url)
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                self.rate_limiter.observe(url, response)
+                if response.status_code == 200:
+                    # Chinese pages often omit the charset header
+                    if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+                        response.encoding = response.apparent_encoding
+                    return response.text, response.url
+
+                print(f"Failed to fetch {url}. Status code: {response.status_code}")
+                if response.status_code not in [429, 500, 502, 503, 504]:
+                    return None, url
+                retry_after = retry_after_seconds(response.headers)
+
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching {url}: {e}")
+                self.rate_limiter.feedback(url, None)
+
+            if retry_count < max_retries - 1:
+                # Exponential backoff, or longer if the server asks for it
+                wait_time = max(retry_delay * (2 ** retry_count), retry_after or 0)
+                print(f"Retrying in {wait_time} seconds...")
+                self.metrics.count_retry('http_fetch')
+                time.sleep(wait_time)
+            retry_count += 1
+
+        return None, url
+
+    def _parse(self, parser, html):
+        """Feed HTML to a parser, returning None if the markup is unusable."""
+        try:
+            parser.feed(html)
+            parser.close()
+            return parser
+        except Exception as e:
+            print(f"Error parsing page: {e}")
+            return None
+
+    def _list_page_links(self, page):
+        """Return the article records (title, url, date, category) of a list page, or None."""
+        if page == 1:
+            parsed, page_url = self._first_page, self.base_url
+        elif self.page_url_template:
+            page_url = self.page_url_template.format(page=page)
+            html, page_url = self._fetch(page_url)
+            parsed = self._parse(ListPageParser(self.site), html) if html else None
+        elif self.page_requests.template:
+            return self.page_requests.fetch(page)
+        else:
+            return None
+
+        if parsed is None or not parsed.articles:
+            return None
+        return [{'title': article['title'], 'url': urljoin(page_url, article['href']),
+                 'date': article['date'], 'category': article['category']}
+                for article in parsed.articles]
+
+    def _process_page(self, page):
+        """Process all links on a list page."""
+        print(f"\nProcessing page {page}...")
+        self.metrics.count('pages')
+        with self.metrics.phase('list_navigation'):
+            links = self._list_page_links(page)
+        if links is None:
+            # Only the links come from the browser; the articles are still read over HTTP
+            print(f"Page {page} not available over HTTP, reading its links in the browser")
+            links = self._browser_page_links(page)
+            if links is None:
+                self.ledger.mark_page(page, 'failed')
+                return
+
+        print(f"Found {len(links)} links on page {page}")
+        known = self.ledger.known_articles(article['url'] for article in links)
+
+        if self.incremental and links and len(known) == len(links):
+            print(f"All {len(links)} articles on page {page} are already known, "
+                  f"stopping incremental crawl")
+            self.caught_up = True
+            return
+
+        for i, article in enumerate(links):
+            title, url = article['title'], article['url']
+            print(f"\nLink {i + 1}/{len(links)}: {title}")
+            if (self.resume or self.incremental) and url in known:
+                print("Already downloaded, skipping")
+                continue
+            self.ledger.record_article(url, title, page, published=article.get('date'),
+                                      category=article.get('category'))
+            self.metrics.count('articles')
+            self._process_link(url, title, page)
+        self.ledger.mark_page(page, 'visited', len(links))
+
+    def _retry_failed_articles(self):
+        """Retry articles that did not complete in a previous run."""
+        failed = self.ledger.failed_articles(self.current_page, self.total_pages)
+        if not failed:
+            return
+        print(f"Retrying {len(failed)} unfinished articles from previous runs...")
+        for i, (url, title, page) in enumerate(failed):
+            print(f"\nRetry {i + 1}/{len(failed)} (page {page}): {title}")
+            self._process_link(url, title, page)
+
+    def _process_link(self, url, title, page=None):
+        """Resolve and download the PDF of an article, falling back to the browser."""
+        print(f"Accessing: {url}")
+        started = time.monotonic()
+        with self.metrics.phase('article_load'):
+            html, page_url = self._fetch(url)
+        self._article_info.start(url, page, round(time.monotonic() - started, 3))
+        with self.metrics.phase('pdf_discovery'):
+            parsed = self._parse(ArticlePageParser(self.site), html) if html else None
+
+        if parsed is not None:
+            file_url_prefix = parsed.file_url_prefix or self.site.default_file_prefix
+            pdf_urls = resolve_pdf_urls(page_url, file_url_prefix, parsed.pdf_paths, parsed.pdf_links,
+                                        marker=self.site.article_path_marker)
+            if pdf_urls:
+                return self.pdf_downloader.dispatch_all(pdf_urls, title, url)
+
+        print("Could not resolve the PDF over HTTP, using the browser")
+        self._get_browser()._process_link(url, title, page=page)
+        return False
+
+    def _record_download(self, record):
+        """Add a finished download to the manifest, with its article's page and load time."""
+        info = self._article_info.report(record['article_url'])
+        self.manifest.write(dict(record, page=info.get('page'), article_s=info.get('article_s')))
+
+    def results(self):
+        """Run the crawl in the background and yield each manifest record as it is written."""
+        return follow(self.manifest, self.start)
+
+    def _browser_page_links(self, page):
+        """Fallback: walk the browser to a list page and return its article records, or None."""
+        browser = self._get_browser()
+        try:
+            if browser.current_page != page:
+                if browser.current_page == page - 1:
+                    navigated = browser._goto_next_page()
+                else:
+                    navigated = browser._navigate_to_specific_page(page)
+                if not navigated:
+                    print(f"Failed to navigate to page {page}")
+                    return None
+            # Fetched with the learned page request rather than in the browser
+            if browser._direct_links is not None:
+                articles, browser._direct_links = browser._direct_links, None
+            else:
+                browser.readiness.list_loaded()
+                articles = browser._harvest_links()
+        except Exception as e:
+            print(f"Error reading page {page} in the browser: {e}")
+            return None
+        return articles
+
+    def _get_browser(self):
+        """Start the Selenium crawler the first time a page needs it."""
+        if self._browser is None:
+            from main_crawler import GuidanceCrawler
+
+            print("Launching browser for fallback...")
+            # Share our download workers and ledger with the fallback browser
+            self._browser = GuidanceCrawler(self.base_url, self.download_dir, self.headless,
+                                            download_workers=0, resume=self.resume,
+                                            ledger=self.ledger, incremental=self.incremental,
+                                            download_pool=self.download_pool,
+                                            browser_profile=self.browser_profile,
+                                            metrics=self.metrics,
+                                            rate_limiter=self.rate_limiter,
+                                            manifest=self.manifest, site=self.site,
+                                            debugger_address=self.debugger_address,
+                                            user_data_dir=self.user_data_dir,
+                                            layout=self.pdf_downloader.layout,
+                                            segment_threshold=self.pdf_downloader.segment_threshold,
+                                            segments=self.pdf_downloader.segments)
+            self._browser.total_pages = self.total_pages
+            # A list request the browser learns is used by our next list page too
+            self._browser.page_requests = self.page_requests
+            # Its downloads reach the same listeners (index, manifest), which find the article's
+            # info in the same place however it was resolved
+            self._browser.pdf_downloader.listeners = self.pdf_downloader.listeners
+            self._browser._article_info = self._article_info
+            self._browser.pdf_downloader.article_info = self._article_info
+            self.rate_limiter.wait(self.base_url)
+            self._browser.driver.get(self.base_url)
+            self._browser.readiness.document_ready('initial_load')
+        return self._browser
@@ -0,0 +1,25 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                      'Chrome/91.0.4472.124 Safari/537.36')
+
+
+def create_session(pool_size=4):
+    """Return a keep-alive session whose connection pool fits `pool_size` concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, pool_size))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = DEFAULT_USER_AGENT
+    # Pages come back compressed; PDF requests ask for identity themselves
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    return session
+
+
+def copy_browser_session(driver, session):
+    """Give a requests session the browser's user agent and cookies."""
+    session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'],
+                            domain=cookie.get('domain'), path=cookie.get('path', '/'))
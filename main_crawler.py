@@ -2,53 +2,164 @@ import time
 import os
 import re
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from pdf_downloader import PDFDownloader
+from download_pool import DownloadPool
+from crawl_ledger import CrawlLedger
+from readiness import PageReadiness
+from driver_pool import TabPool
+from page_addressing import PageRequestCache
+from browser_profile import build_chrome_options, apply_profile, ready_states
+from metrics import CrawlMetrics
+from rate_limiter import RateLimiter
+from manifest import ArticleInfo, CrawlManifest, MANIFEST_FILENAME, follow
+from site_profiles import profile_for_url
+
+METRICS_FILENAME = "crawl_metrics.json"
+
+# Every article link of a list page with its list metadata, as plain records in one round-trip
+HARVEST_LINKS_SCRIPT = """
+var clean = function (text) { return (text || '').replace(/\\s+/g, ' ').trim(); };
+var itemSelector = arguments[1];
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (link) {
+    var item = link.closest(itemSelector) || link.parentElement;
+    var rest = clean(item.innerText.replace(link.innerText, ' '));
+    var date = item.querySelector('[class*="date"], [class*="time"]');
+    var dateMatch = (date ? clean(date.innerText) : rest).match(/\\d{4}[-./年]\\d{1,2}[-./月]\\d{1,2}/);
+    var category = item.querySelector('[class*="categ"], [class*="type"], [class*="column"]');
+    return {
+        title: clean(link.innerText),
+        url: link.href,
+        date: dateMatch ? dateMatch[0] : null,
+        category: category ? clean(category.innerText) : null
+    };
+});
+"""
 
 
 class GuidanceCrawler:
-    def __init__(self, base_url, download_dir='downloads', headless=True):
+    def __init__(self, base_url, download_dir='downloads', headless=True, download_workers=4,
+                 resume=False, ledger=None, incremental=False, end_page=None, download_pool=None,
+                 browser_profile='default', metrics=None, progress_interval=None,
+                 metrics_filename=METRICS_FILENAME, rate_limiter=None, manifest=None, site=None,
+                 debugger_address=None, user_data_dir=None, layout='flat', segment_threshold=None,
+                 segments=4):
         """Initialize the crawler."""
         self.base_url = base_url
+        # Selectors and conventions of the site (see site_profiles)
+        self.site = site or profile_for_url(base_url)
         self.current_page = 1
         self.total_pages = None
+        # Last page to crawl (default: all pages)
+        self.end_page = end_page
         self.download_dir = download_dir
+        # Skip work the ledger already records as done, and retry earlier failures
+        self.resume = resume
+        # Stop paging at the first list page whose articles were all downloaded before
+        self.incremental = incremental
+        self.caught_up = False
+
+        # Paces page loads and downloads against the site
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # Background download workers (0 downloads inline in the browser thread); the rate
+        # limiter's adaptive slots decide how many of them download at once
+        if download_pool is None and download_workers > 0:
+            download_pool = DownloadPool(self.rate_limiter.max_concurrency)
+        self.download_pool = download_pool
 
         # Create download directory if it doesn't exist
         if not os.path.exists(download_dir):
             os.makedirs(download_dir)
 
-        # Set up Chrome options
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-gpu")
-
-        # Initialize the driver
-        self.driver = webdriver.Chrome(options=chrome_options)
+        # Persistent record of pages, articles and downloads for resumable runs
+        self.ledger = ledger or CrawlLedger(download_dir)
+
+        # Per-phase timings, reported as JSON when the crawl ends
+        self.metrics = metrics or CrawlMetrics()
+        self.progress_interval = progress_interval
+        self.metrics_filename = metrics_filename
+
+        # Initialize the driver, with a warm tab for article pages
+        self.headless = headless
+        self.browser_profile = browser_profile
+        # Attach to a running Chrome, or keep a profile with a warm cache (see build_chrome_options)
+        self.debugger_address = debugger_address
+        self.user_data_dir = user_data_dir
+        self.tab_pool = TabPool(self._create_driver, attached=bool(debugger_address))
+        self.driver = self.tab_pool.driver
+        # Waits on page signals instead of fixed sleeps
+        self.readiness = PageReadiness(self.driver, ready_states=ready_states(browser_profile),
+                                       site=self.site)
+        # One downloader for the whole run, reading from the article tab
+        self.pdf_downloader = PDFDownloader(self.driver, self.download_dir, self.download_pool,
+                                            self.ledger, metrics=self.metrics,
+                                            rate_limiter=self.rate_limiter, site=self.site,
+                                            layout=layout, segment_threshold=segment_threshold,
+                                            segments=segments)
+
+        # Results as JSONL, one line per article PDF, written as they complete
+        self.manifest = manifest or CrawlManifest(os.path.join(download_dir, MANIFEST_FILENAME))
+        # List page and load time of each article, for its manifest record
+        self._article_info = ArticleInfo()
+        self.pdf_downloader.article_info = self._article_info
+        self.pdf_downloader.add_listener(self._record_download)
+
+        # Request behind gotopage(n), learned once so list pages can be fetched directly
+        self.page_requests = PageRequestCache(self.ledger, base_url, rate_limiter=self.rate_limiter,
+                                              site=self.site)
+        self.page_requests.session = self.pdf_downloader.session
+        self._page_request_tried = False
+        # Browser whose cookies the page request session carries
+        self._page_session_driver = None
+        self._direct_links = None
+
+    def _create_driver(self):
+        """Start a Chrome instance."""
+        chrome_options = build_chrome_options(self.browser_profile, self.headless,
+                                              self.debugger_address, self.user_data_dir)
+        driver = webdriver.Chrome(options=chrome_options)
+        apply_profile(driver, self.browser_profile)
+        return driver
 
     def start(self):
         """Start the crawling process."""
         try:
             print(f"Starting crawler on {self.base_url}")
-            self.driver.get(self.base_url)
-            time.sleep(8)  # Longer wait for initial page load
+            self.metrics.start_progress(self.progress_interval)
+            with self.metrics.phase('list_navigation'):
+                self.rate_limiter.wait(self.base_url)
+                self.driver.get(self.base_url)
+                self.readiness.document_ready('initial_load')
+                try:
+                    self.readiness.list_loaded('initial_list')
+                except TimeoutException:
+                    print("Article list did not appear on the initial page")
 
             # Get total pages
             total_pages = self._get_total_pages()
-            self.total_pages = total_pages
             print(f"Total pages found: {total_pages}")
+            if self.end_page:
+                total_pages = min(total_pages, self.end_page)
+            self.total_pages = total_pages
+
+            if self.resume:
+                self._retry_failed_articles()
+                resume_page = self.ledger.first_unvisited_page(self.current_page, self.total_pages)
+                if resume_page != self.current_page:
+                    print(f"Resuming from page {resume_page}")
+                    self.current_page = resume_page
 
             # If we need to start from a page other than 1, navigate to that page first
             if self.current_page > 1:
                 print(f"Navigating to start page {self.current_page}...")
-                if not self._navigate_to_specific_page(self.current_page):
+                with self.metrics.phase('list_navigation'):
+                    navigated = self._navigate_to_specific_page(self.current_page)
+                if not navigated:
                     print(f"Failed to navigate to start page {self.current_page}. Exiting.")
                     return
 
@@ -56,21 +167,33 @@ class GuidanceCrawler:
             self._process_current_page()
 
             # Go through all remaining pages
-            while self.current_page < self.total_pages:
-                if self._goto_next_page():
+            while self.current_page < self.total_pages and not self.caught_up:
+                with self.metrics.phase('list_navigation'):
+                    navigated = self._goto_next_page()
+                if navigated:
                     self._process_current_page()
                 else:
                     print(f"Failed to navigate to page {self.current_page + 1}")
                     break
         finally:
+            self.readiness.report()
+            self.rate_limiter.report()
             print("Closing browser...")
-            self.driver.quit()
+            self.tab_pool.close()
+
+            # Let queued downloads finish before returning
+            if self.download_pool is not None:
+                self.download_pool.drain()
+            self.metrics.stop_progress()
+            self.metrics.report(os.path.join(self.download_dir, self.metrics_filename))
+            self.manifest.close()
+            self.ledger.close()
 
     def _get_total_pages(self):
         """Get the total number of pages."""
         try:
             # Find the element that shows the total number of pages
-            page_info_element = self.driver.find_element(By.CSS_SELECTOR, ".pageTagLiInfo.info.gong")
+            page_info_element = self.driver.find_element(By.CSS_SELECTOR, self.site.page_count_selector)
             page_info_text = page_info_element.text
 
             # Extract the number using regex
@@ -91,23 +214,23 @@ class GuidanceCrawler:
     def _process_current_page(self):
         """Process all links on the current page."""
         print(f"\nProcessing page {self.current_page}...")
+        self.metrics.count('pages')
+
+        # The page was fetched directly, without the browser
+        if self._direct_links is not None:
+            links, self._direct_links = self._direct_links, None
+            print(f"Found {len(links)} links on page {self.current_page}")
+            self._process_links(links)
+            return
 
         try:
-            # Wait for the content to load with a longer timeout
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.ID, "topdownlist"))
-            )
+            # Wait for the content to load
+            self.readiness.list_loaded()
 
             # Get all article links
-            links = self.driver.find_elements(By.CSS_SELECTOR, "#topdownlist li.listp a")
+            links = self._harvest_links()
             print(f"Found {len(links)} links on page {self.current_page}")
-
-            # Process each link
-            for i, link in enumerate(links):
-                title = link.text
-                url = link.get_attribute("href")
-                print(f"\nLink {i + 1}/{len(links)}: {title}")
-                self._process_link(url, title)
+            self._process_links(links)
 
         except TimeoutException:
             print(f"Timeout waiting for content on page {self.current_page}")
@@ -119,44 +242,79 @@ class GuidanceCrawler:
             # Try refreshing the page
             print("Attempting to refresh the page...")
             self.driver.refresh()
-            time.sleep(8)  # Wait longer after refresh
 
             # Try again after refresh
             try:
-                links = self.driver.find_elements(By.CSS_SELECTOR, "#topdownlist li.listp a")
+                self.readiness.document_ready('refresh')
+                self.readiness.list_loaded('refresh_list')
+                links = self._harvest_links()
                 print(f"After refresh: Found {len(links)} links")
-
-                # Process each link
-                for i, link in enumerate(links):
-                    title = link.text
-                    url = link.get_attribute("href")
-                    print(f"\nLink {i + 1}/{len(links)}: {title}")
-                    self._process_link(url, title)
+                self._process_links(links)
             except Exception as e:
                 print(f"Error after refresh: {e}")
+                self.ledger.mark_page(self.current_page, 'failed')
 
         except Exception as e:
             print(f"Error processing page {self.current_page}: {e}")
-
-    def _process_link(self, url, title, max_retries=3, retry_delay=5):
+            self.ledger.mark_page(self.current_page, 'failed')
+
+    def _harvest_links(self):
+        """Read every article link on the current list page as plain records, in one call."""
+        with self.metrics.phase('link_harvest'):
+            return self.driver.execute_script(HARVEST_LINKS_SCRIPT, self.site.link_selector,
+                                              self.site.item_selector) or []
+
+    def _process_links(self, articles):
+        """Process each article record of the current page and record the page as visited."""
+        known = self.ledger.known_articles(article['url'] for article in articles)
+
+        if self.incremental and articles and len(known) == len(articles):
+            print(f"All {len(articles)} articles on page {self.current_page} are already known, "
+                  f"stopping incremental crawl")
+            self.caught_up = True
+            return
+
+        for i, article in enumerate(articles):
+            title, url = article['title'], article['url']
+            print(f"\nLink {i + 1}/{len(articles)}: {title}")
+            if (self.resume or self.incremental) and url in known:
+                print("Already downloaded, skipping")
+                continue
+            self.ledger.record_article(url, title, self.current_page,
+                                      published=article.get('date'), category=article.get('category'))
+            self.metrics.count('articles')
+            self._process_link(url, title)
+        self.ledger.mark_page(self.current_page, 'visited', len(articles))
+
+    def _retry_failed_articles(self):
+        """Retry articles that did not complete in a previous run."""
+        failed = self.ledger.failed_articles(self.current_page, self.total_pages)
+        if not failed:
+            return
+        print(f"Retrying {len(failed)} unfinished articles from previous runs...")
+        for i, (url, title, page) in enumerate(failed):
+            print(f"\nRetry {i + 1}/{len(failed)} (page {page}): {title}")
+            self._process_link(url, title, page=page)
+
+    def _process_link(self, url, title, max_retries=3, retry_delay=5, page=None):
         """Process a single link to a guidance page with retry mechanism."""
+        self._article_info.start(url, page or self.current_page)
         retry_count = 0
         while retry_count < max_retries:
-            original_window = self.driver.current_window_handle
-
             try:
-                # Open the link in a new tab
-                self.driver.execute_script("window.open('');")
-                self.driver.switch_to.window(self.driver.window_handles[1])
-
-                # Navigate to the URL
-                print(f"Accessing: {url} (Attempt {retry_count + 1}/{max_retries})")
-                self.driver.get(url)
-                time.sleep(5)  # Longer wait for page to load
-
-                # Look for PDF download buttons and download the PDF
-                pdf_downloader = PDFDownloader(self.driver, self.download_dir)
-                pdf_downloader.find_and_download_pdf(title)
+                # Load the article in place in the warm article tab
+                with self.tab_pool.article_tab():
+                    print(f"Accessing: {url} (Attempt {retry_count + 1}/{max_retries})")
+                    self.rate_limiter.wait(url)
+                    started = time.monotonic()
+                    with self.metrics.phase('article_load'):
+                        self.driver.get(url)
+                        self.readiness.article_ready()
+                    self._article_info.set_load_time(url, round(time.monotonic() - started, 3))
+
+                    # Look for PDF download buttons and download the PDF
+                    if not self.pdf_downloader.find_and_download_pdf(title, article_url=url):
+                        self._article_failed(url, title, "no PDF found")
                 break  # Success, exit the retry loop
 
             except TimeoutException:
@@ -165,68 +323,84 @@ class GuidanceCrawler:
                     wait_time = retry_delay * (2 ** retry_count)  # Exponential backoff
                     print(f"Retrying in {wait_time} seconds...")
                     retry_count += 1
-                    # Close the tab if it was opened before the timeout
-                    try:
-                        self.driver.close()
-                        self.driver.switch_to.window(original_window)
-                    except:
-                        pass
+                    self.metrics.count_retry('article')
                     time.sleep(wait_time)
                     continue
                 else:
                     print("Maximum retries reached. Timeout persists.")
+                    self._article_failed(url, title, "timeout")
                     break
 
             except Exception as e:
                 print(f"Error processing link: {e}")
+                if not self.tab_pool.healthy():
+                    self._recover_driver()
                 if retry_count < max_retries - 1:
                     wait_time = retry_delay * (2 ** retry_count)  # Exponential backoff
                     print(f"Retrying in {wait_time} seconds...")
                     retry_count += 1
-                    # Close the tab if it was opened before the error
-                    try:
-                        self.driver.close()
-                        self.driver.switch_to.window(original_window)
-                    except:
-                        pass
+                    self.metrics.count_retry('article')
                     time.sleep(wait_time)
                     continue
                 else:
                     print("Maximum retries reached. Error persists.")
+                    self._article_failed(url, title, str(e))
                     break
 
-            finally:
-                # Make sure we close the tab and switch back to the main window
-                try:
-                    self.driver.close()
-                    self.driver.switch_to.window(original_window)
-                except Exception as e:
-                    print(f"Error while closing tab: {e}")
-                    # If we can't close the tab, try to at least get back to the original window
-                    try:
-                        if len(self.driver.window_handles) > 0:
-                            self.driver.switch_to.window(self.driver.window_handles[0])
-                    except:
-                        pass
+    def _article_failed(self, url, title, error):
+        """Record an article whose PDF could not be resolved."""
+        self.ledger.update_article(url, 'failed', error=error)
+        info = self._article_info.drop(url)
+        self.manifest.write({'title': title, 'article_url': url, 'page': info.get('page'),
+                             'status': 'failed', 'error': error, 'article_s': info.get('article_s')})
+
+    def _record_download(self, record):
+        """Add a finished download to the manifest, with its article's page and load time."""
+        info = self._article_info.report(record['article_url'])
+        self.manifest.write(dict(record, page=info.get('page'), article_s=info.get('article_s')))
+
+    def results(self):
+        """Run the crawl in the background and yield each manifest record as it is written."""
+        return follow(self.manifest, self.start)
+
+    def _recover_driver(self):
+        """Replace a crashed browser and bring the new one back to the current list page."""
+        self.driver = self.tab_pool.recycle()
+        self.readiness.driver = self.driver
+        self.pdf_downloader.driver = self.driver
+        try:
+            self.rate_limiter.wait(self.base_url)
+            self.driver.get(self.base_url)
+            self.readiness.document_ready('initial_load')
+            if self.current_page > 1:
+                page = self.current_page
+                self.current_page = 1
+                self._navigate_to_specific_page(page)
+                # Only the browser position matters here; the links are being processed already
+                self._direct_links = None
+        except Exception as e:
+            print(f"Error restoring list page after browser restart: {e}")
 
     def _goto_next_page(self, max_retries=4, retry_delay=5):
         """Navigate to the next page with retry mechanism."""
+        # Seek absolutely the first time (to learn the page request) and whenever it is known
+        if self.page_requests.template or not self._page_request_tried:
+            self._page_request_tried = True
+            return self._navigate_to_specific_page(self.current_page + 1)
+
         retry_count = 0
         while retry_count < max_retries:
             try:
                 # Find and click the "Next Page" button
                 next_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "li.clickpage.next"))
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, self.site.next_selector))
                 )
+                snapshot = self.readiness.list_snapshot()
+                self.rate_limiter.wait(self.base_url)
                 next_button.click()
 
-                # Wait longer for the page to refresh
-                time.sleep(8)
-
-                # Wait for new content to load
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.ID, "topdownlist"))
-                )
+                # Wait for the old list to be replaced by the next page
+                self.readiness.page_changed(snapshot, self.current_page + 1)
 
                 # Update current page counter
                 self.current_page += 1
@@ -240,6 +414,7 @@ class GuidanceCrawler:
                     print(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                     retry_count += 1
+                    self.metrics.count_retry('next_page')
                     continue
                 else:
                     print("Maximum retries reached. Could not navigate to next page.")
@@ -256,6 +431,7 @@ class GuidanceCrawler:
                     print(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                     retry_count += 1
+                    self.metrics.count_retry('next_page')
                     continue
                 else:
                     print("Maximum retries reached. Error persists.")
@@ -265,6 +441,15 @@ class GuidanceCrawler:
 
     def _navigate_to_specific_page(self, target_page, max_retries=3, retry_delay=5):
         """Navigate to a specific page using direct JavaScript execution."""
+        # One request instead of any browser navigation, once we know what gotopage() asks for
+        if self._fetch_page_directly(target_page):
+            return True
+
+        # Links of the page we leave, to check a request learned from this jump on a second page
+        leaving = None
+        if not self.page_requests.template:
+            leaving = (self.current_page, {article['url'] for article in self._harvest_links()})
+
         retry_count = 0
 
         while retry_count < max_retries:
@@ -272,15 +457,15 @@ class GuidanceCrawler:
                 print(f"Attempting to jump directly to page {target_page} using JavaScript...")
 
                 # Direct JavaScript execution to jump to the target page
-                self.driver.execute_script(f"gotopage({target_page});")
-
-                # Wait a long time for the page to load completely
-                time.sleep(10)
+                self.page_requests.install_capture(self.driver)
+                self.rate_limiter.wait(self.base_url)
+                self.driver.execute_script(self.site.goto_page_script.format(page=target_page))
 
                 # Verify we're on the correct page by checking the "current" page button
                 try:
+                    self.readiness.on_page(target_page)
                     current_page_element = WebDriverWait(self.driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "li.clickpage.current"))
+                        EC.presence_of_element_located((By.CSS_SELECTOR, self.site.current_page_selector))
                     )
 
                     current_page_text = current_page_element.text.strip()
@@ -290,9 +475,11 @@ class GuidanceCrawler:
 
                         # Make sure the content is loaded
                         WebDriverWait(self.driver, 15).until(
-                            EC.presence_of_element_located((By.ID, "topdownlist"))
+                            EC.presence_of_element_located((By.CSS_SELECTOR, self.site.list_container))
                         )
 
+                        if not self.page_requests.template:
+                            self._learn_page_request(target_page, leaving)
                         return True
                     else:
                         print(f"Page verification failed. Current page shows: {current_page_text}")
@@ -301,8 +488,9 @@ class GuidanceCrawler:
                         if retry_count < max_retries - 1:
                             print("Refreshing the page before retry...")
                             self.driver.refresh()
-                            time.sleep(8)
+                            self.readiness.document_ready('refresh')
                             retry_count += 1
+                            self.metrics.count_retry('goto_page')
                             continue
                         else:
                             print("Maximum retries reached. Using fallback navigation...")
@@ -313,8 +501,9 @@ class GuidanceCrawler:
                     if retry_count < max_retries - 1:
                         print("Refreshing the page before retry...")
                         self.driver.refresh()
-                        time.sleep(8)
+                        self.readiness.document_ready('refresh')
                         retry_count += 1
+                        self.metrics.count_retry('goto_page')
                         continue
                     else:
                         print("Maximum retries reached. Using fallback navigation...")
@@ -327,6 +516,7 @@ class GuidanceCrawler:
                     print(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                     retry_count += 1
+                    self.metrics.count_retry('goto_page')
                     continue
                 else:
                     print("Maximum retries reached. Using fallback navigation...")
@@ -334,6 +524,54 @@ class GuidanceCrawler:
 
         return False
 
+    def _fetch_page_directly(self, page):
+        """Fetch a list page with the learned request. Returns True on success."""
+        if not self.page_requests.template:
+            return False
+        # Send the browser's cookies and user agent, also with a template from an earlier run
+        if self._page_session_driver is not self.driver:
+            self.page_requests.use_browser_session(self.driver)
+            self._page_session_driver = self.driver
+
+        articles = self.page_requests.fetch(page)
+        if not articles:
+            print(f"Could not fetch page {page} directly, using the browser")
+            return False
+
+        print(f"Fetched page {page} directly")
+        self.current_page = page
+        self._direct_links = articles
+        return True
+
+    def _learn_page_request(self, page, leaving=None):
+        """Learn the request gotopage() just made, keeping it only if it returns the same links.
+
+        `leaving` is (page, link URLs) of the page the browser jumped from; the
+        request must reproduce that page too, so a parameter that merely equals
+        the page number (e.g. a column id) isn't mistaken for it.
+        """
+        if not self.page_requests.learn(self.driver, page):
+            return
+
+        self.page_requests.use_browser_session(self.driver)
+        self._page_session_driver = self.driver
+        checks = [(page, {article['url'] for article in self._harvest_links()})]
+        if leaving is not None and leaving[0] != page:
+            checks.append(leaving)
+        if len(checks) < 2:
+            print("No second page to check the direct page fetch against, keeping browser navigation")
+            self.page_requests.forget()
+            return
+
+        for check_page, expected in checks:
+            fetched = self.page_requests.fetch(check_page) or []
+            if not expected or {article['url'] for article in fetched} != expected:
+                print(f"Direct fetch of page {check_page} doesn't match the browser, "
+                      f"keeping browser navigation")
+                self.page_requests.forget()
+                return
+        self.page_requests.save()
+
     def _navigate_by_first_last_buttons(self, target_page, max_retries=3, retry_delay=5):
         """Fallback method to navigate using first, last, next, and previous buttons."""
         print(f"Using fallback navigation method to reach page {target_page}...")
@@ -342,38 +580,47 @@ class GuidanceCrawler:
             # If target is page 1, use "首页" (first page) button
             if target_page == 1:
                 first_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "li.clickpage.first"))
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, self.site.first_selector))
                 )
+                snapshot = self.readiness.list_snapshot()
+                self.rate_limiter.wait(self.base_url)
                 first_button.click()
-                time.sleep(8)
+                self.readiness.page_changed(snapshot, 1, step='first_page')
                 self.current_page = 1
                 return True
 
             # If target is the last page, use "末页" (last page) button
             if target_page == self.total_pages:
                 last_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "li.clickpage.last"))
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, self.site.last_selector))
                 )
+                snapshot = self.readiness.list_snapshot()
+                self.rate_limiter.wait(self.base_url)
                 last_button.click()
-                time.sleep(8)
+                self.readiness.page_changed(snapshot, self.total_pages, step='last_page')
                 self.current_page = self.total_pages
                 return True
 
             # For other pages, start from page 1 and use next button repeatedly
             first_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "li.clickpage.first"))
+                EC.element_to_be_clickable((By.CSS_SELECTOR, self.site.first_selector))
             )
-            first_button.click()
-            time.sleep(8)
+            if self.readiness.current_page_number() != 1:
+                snapshot = self.readiness.list_snapshot()
+                self.rate_limiter.wait(self.base_url)
+                first_button.click()
+                self.readiness.page_changed(snapshot, 1, step='first_page')
             self.current_page = 1
 
             # Click next button until we reach target page
             while self.current_page < target_page:
                 next_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "li.clickpage.next"))
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, self.site.next_selector))
                 )
+                snapshot = self.readiness.list_snapshot()
+                self.rate_limiter.wait(self.base_url)
                 next_button.click()
-                time.sleep(8)
+                self.readiness.page_changed(snapshot, self.current_page + 1)
                 self.current_page += 1
                 print(f"Navigated to page {self.current_page}")
 
@@ -0,0 +1,122 @@
+import json
+import queue
+import threading
+import time
+
+MANIFEST_FILENAME = "manifest.jsonl"
+
+
+class CrawlManifest:
+    """Append-only JSONL log of crawl results, one line per article PDF, flushed as they finish.
+
+    Subscribers get the same records on a queue, followed by None when the
+    crawl ends.
+    """
+
+    def __init__(self, path=None):
+        """Open the manifest for appending (no file if path is None)."""
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self.records = 0
+
+    def write(self, record):
+        """Append one record and pass it to the subscribers."""
+        record = dict(record, time=round(time.time(), 3))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self._file.flush()
+            self.records += 1
+            for subscriber in self._subscribers:
+                subscriber.put(record)
+
+    def subscribe(self):
+        """Return a queue that receives every record written from now on."""
+        subscriber = queue.Queue()
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def close(self):
+        """Close the file and tell the subscribers no more records are coming."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for subscriber in self._subscribers:
+                subscriber.put(None)
+            self._subscribers = []
+
+
+class ArticleInfo:
+    """List page and load time of the articles being downloaded, for their manifest records.
+
+    An entry is dropped once every PDF its article queued has been
+    reported, or when the article fails.
+    """
+
+    def __init__(self):
+        """Start with no articles."""
+        self._info = {}
+        self._lock = threading.Lock()
+
+    def start(self, url, page, article_s=None):
+        """Remember an article as it is opened."""
+        with self._lock:
+            self._info[url] = {'page': page, 'article_s': article_s}
+
+    def set_load_time(self, url, article_s):
+        """Record how long the article page took to load."""
+        with self._lock:
+            if url in self._info:
+                self._info[url]['article_s'] = article_s
+
+    def expect(self, url, count):
+        """Note how many PDFs the article queued, before the first of them is downloaded."""
+        with self._lock:
+            if url in self._info:
+                self._info[url].update(pdfs=count, reported=0)
+
+    def report(self, url):
+        """Return the info for one finished PDF of the article, dropping it after the last."""
+        with self._lock:
+            info = self._info.get(url)
+            if info is None:
+                return {}
+            info['reported'] = info.get('reported', 0) + 1
+            if info['reported'] >= info.get('pdfs', 1):
+                del self._info[url]
+            return info
+
+    def drop(self, url):
+        """Forget an article, e.g. one that failed, and return its info."""
+        with self._lock:
+            return self._info.pop(url, {})
+
+
+def follow(manifest, run):
+    """Call run() in a background thread and yield the manifest records while it runs."""
+    subscriber = manifest.subscribe()
+    errors = []
+
+    def target():
+        try:
+            run()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # run() normally closes the manifest; make sure the loop below ends
+            manifest.close()
+
+    thread = threading.Thread(target=target, name="crawl", daemon=True)
+    thread.start()
+    while True:
+        record = subscriber.get()
+        if record is None:
+            break
+        yield record
+    thread.join()
+    if errors:
+        raise errors[0]
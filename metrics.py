@@ -0,0 +1,122 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+class CrawlMetrics:
+    """Collects per-phase timings, retry counts and transfer rates for a crawl."""
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.timings = {}
+        self.retries = {}
+        self.counters = {}
+        self.bytes_downloaded = 0
+        self.transfer_seconds = 0.0
+        self._progress_stop = None
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one sample of a phase."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, time.monotonic() - started)
+
+    def record(self, name, seconds):
+        """Add one timing sample to a phase."""
+        with self._lock:
+            self.timings.setdefault(name, []).append(seconds)
+
+    def count_retry(self, phase):
+        """Count a retry in one of the backoff loops."""
+        with self._lock:
+            self.retries[phase] = self.retries.get(phase, 0) + 1
+
+    def count(self, name, amount=1):
+        """Increase a named counter (pages, articles, PDFs...)."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_transfer(self, size, seconds):
+        """Record bytes received by a download and how long it took."""
+        with self._lock:
+            self.bytes_downloaded += size
+            self.transfer_seconds += seconds
+
+    def summary(self):
+        """Return all metrics as a JSON-serializable dict."""
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            phases = {}
+            for name, samples in self.timings.items():
+                phases[name] = {
+                    'count': len(samples),
+                    'total_s': round(sum(samples), 3),
+                    'p50_s': round(percentile(samples, 0.50), 3),
+                    'p95_s': round(percentile(samples, 0.95), 3),
+                    'max_s': round(max(samples), 3),
+                }
+            return {
+                'elapsed_s': round(elapsed, 3),
+                'phases': phases,
+                'retries': dict(self.retries),
+                'counters': dict(self.counters),
+                'bytes_downloaded': self.bytes_downloaded,
+                # Per-download throughput, and overall throughput across parallel downloads
+                'transfer_bytes_per_s': round(self.bytes_downloaded / self.transfer_seconds)
+                if self.transfer_seconds else 0,
+                'overall_bytes_per_s': round(self.bytes_downloaded / elapsed) if elapsed else 0,
+            }
+
+    def progress_line(self):
+        """Return a one-line progress summary."""
+        summary = self.summary()
+        counters = ', '.join(f"{name} {value}" for name, value in sorted(summary['counters'].items()))
+        megabytes = summary['bytes_downloaded'] / (1024 * 1024)
+        rate = summary['overall_bytes_per_s'] / 1024
+        return (f"[progress {summary['elapsed_s']:.0f}s] {counters or 'starting'}; "
+                f"{megabytes:.1f} MB at {rate:.0f} KB/s; retries {sum(summary['retries'].values())}")
+
+    def start_progress(self, interval):
+        """Print a progress line every `interval` seconds from a background thread."""
+        if not interval or self._progress_stop is not None:
+            return
+        self._progress_stop = threading.Event()
+
+        def report():
+            while not self._progress_stop.wait(interval):
+                print(self.progress_line())
+
+        threading.Thread(target=report, name="crawl-progress", daemon=True).start()
+
+    def stop_progress(self):
+        """Stop the periodic progress lines."""
+        if self._progress_stop is not None:
+            self._progress_stop.set()
+            self._progress_stop = None
+
+    def report(self, path=None):
+        """Print the JSON summary and optionally write it to a file."""
+        summary = self.summary()
+        text = json.dumps(summary, indent=2, ensure_ascii=False)
+        print("Crawl metrics:")
+        print(text)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return summary
@@ -0,0 +1,61 @@
+import os
+import threading
+
+from http_crawler import HTTPGuidanceCrawler
+from download_pool import DownloadPool
+from rate_limiter import RateLimiter
+
+
+class MultiSiteCrawler:
+    """Crawls several journal sites at once in one process, one thread per site.
+
+    Sites use the http engine (Chrome starts only for a site that needs the
+    fallback) and share one download pool and one rate limiter, which paces
+    each host separately. Every site keeps its ledger, manifest and metrics
+    in its own subfolder of the download dir.
+    """
+
+    def __init__(self, sites, download_dir='downloads', headless=True, download_workers=4,
+                 resume=False, incremental=False, browser_profile='default', progress_interval=None,
+                 rate_limiter=None, layout='flat', segment_threshold=None, segments=4):
+        """Initialize one crawler per SiteProfile."""
+        self.sites = list(sites)
+        self.download_dir = download_dir
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Sized for every site downloading as much at once as the rate limiter allows
+        self.download_pool = DownloadPool(self.rate_limiter.max_concurrency * len(self.sites))
+        self.crawlers = []
+        for site in self.sites:
+            if not site.base_url:
+                raise ValueError(f"Site profile {site.name} has no base_url")
+            crawler = HTTPGuidanceCrawler(site.base_url, os.path.join(download_dir, site.name),
+                                          headless, download_workers=download_workers,
+                                          resume=resume, incremental=incremental,
+                                          browser_profile=browser_profile,
+                                          progress_interval=progress_interval,
+                                          rate_limiter=self.rate_limiter, site=site,
+                                          download_pool=self.download_pool, layout=layout,
+                                          segment_threshold=segment_threshold, segments=segments)
+            self.crawlers.append(crawler)
+
+    def start(self):
+        """Crawl all sites, then wait for the shared downloads."""
+        threads = [threading.Thread(target=self._crawl_site, args=(crawler,),
+                                    name=f"site-{crawler.site.name}")
+                   for crawler in self.crawlers]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.download_pool.drain()
+            for crawler in self.crawlers:
+                crawler.close()
+
+    def _crawl_site(self, crawler):
+        """Thread body: crawl one site, reporting rather than raising errors."""
+        try:
+            crawler.start()
+        except Exception as e:
+            print(f"[{crawler.site.name}] Crawl failed: {e}")
@@ -0,0 +1,238 @@
+import json
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+
+from page_parsers import ListPageParser, parse_selector
+from site_profiles import DEFAULT_SITE
+from http_session import create_session, copy_browser_session
+
+# Records the requests the page makes, so we can see what gotopage(n) asks the server for
+CAPTURE_SCRIPT = """
+if (!window.__crawlerRequests) {
+    window.__crawlerRequests = [];
+    var open = XMLHttpRequest.prototype.open, send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__crawlerRequest = {kind: 'xhr', method: method, url: String(url), body: null};
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function (body) {
+        if (this.__crawlerRequest) {
+            this.__crawlerRequest.body = typeof body === 'string' ? body : null;
+            window.__crawlerRequests.push(this.__crawlerRequest);
+        }
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function (input, init) {
+            window.__crawlerRequests.push({
+                kind: 'fetch',
+                method: (init && init.method) || 'GET',
+                url: typeof input === 'string' ? input : input.url,
+                body: init && typeof init.body === 'string' ? init.body : null
+            });
+            return originalFetch.apply(this, arguments);
+        };
+    }
+}
+window.__crawlerRequests.length = 0;
+"""
+
+TEMPLATE_META_KEY = "page_request_template:{base_url}"
+
+# Short parameter names that mean the page number; any name containing "page" does too
+PAGE_PARAM_NAMES = ('p', 'pn', 'pg', 'curr', 'current')
+
+
+def _find_page_param(pairs, page):
+    """Return the name of the parameter whose value is the page number, or None.
+
+    Other parameters can have the same value (e.g. columnId=2&page=2), so a
+    name that looks like a page number wins over the first match.
+    """
+    names = [name for name, value in pairs if value == str(page)]
+    for name in names:
+        if 'page' in name.lower() or name.lower() in PAGE_PARAM_NAMES:
+            return name
+    return names[0] if names else None
+
+
+def template_from_request(request, page, page_url):
+    """Turn a captured request for `page` into a reusable template, or None.
+
+    The page number has to appear as the value of a query string, form or
+    JSON body parameter, which becomes the placeholder.
+    """
+    url = urljoin(page_url, request.get('url') or '')
+    method = (request.get('method') or 'GET').upper()
+    body = request.get('body')
+    query = parse_qsl(urlsplit(url).query, keep_blank_values=True)
+
+    param = _find_page_param(query, page)
+    if param:
+        return {'method': method, 'url': url, 'body': body, 'param': param, 'location': 'query',
+                'kind': request.get('kind'), 'referer': page_url}
+
+    if body:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            param = _find_page_param([(k, str(v)) for k, v in data.items()], page)
+            if param:
+                return {'method': method, 'url': url, 'body': body, 'param': param,
+                        'location': 'json', 'kind': request.get('kind'), 'referer': page_url}
+        else:
+            param = _find_page_param(parse_qsl(body, keep_blank_values=True), page)
+            if param:
+                return {'method': method, 'url': url, 'body': body, 'param': param,
+                        'location': 'form', 'kind': request.get('kind'), 'referer': page_url}
+    return None
+
+
+def _html_fragments(value):
+    """Yield the strings inside a JSON document that look like list markup."""
+    if isinstance(value, str):
+        if '<a' in value:
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _html_fragments(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _html_fragments(item)
+
+
+class PageRequestCache:
+    """Learns the request behind gotopage(n) once, then fetches any list page directly."""
+
+    def __init__(self, ledger, base_url, timeout=15, rate_limiter=None, site=DEFAULT_SITE):
+        """Load a template saved by an earlier run, if any."""
+        self.ledger = ledger
+        self.base_url = base_url
+        self.site = site
+        self.timeout = timeout
+        # Optional RateLimiter shared with the rest of the crawl
+        self.rate_limiter = rate_limiter
+        self.session = None
+        self._meta_key = TEMPLATE_META_KEY.format(base_url=base_url)
+        saved = ledger.get_meta(self._meta_key) if ledger is not None else None
+        self.template = json.loads(saved) if saved else None
+
+    def install_capture(self, driver):
+        """Start recording the page's XHR/fetch requests."""
+        driver.execute_script(CAPTURE_SCRIPT)
+
+    def learn(self, driver, page):
+        """Build the template from what gotopage(page) requested. Returns True on success.
+
+        The template is only used in this run until save() is called.
+        """
+        requests_made = driver.execute_script("return window.__crawlerRequests || [];") or []
+        # A plain navigation (form/GET) leaves the page number in the new URL instead
+        candidates = list(reversed(requests_made)) + [{'kind': 'navigation', 'method': 'GET',
+                                                        'url': driver.current_url, 'body': None}]
+        for request in candidates:
+            template = template_from_request(request, page, driver.current_url)
+            if template:
+                self.template = template
+                print(f"Learned list page request: {template['method']} {template['url']} "
+                      f"(page parameter '{template['param']}')")
+                return True
+        print("Could not find the list page request behind gotopage()")
+        return False
+
+    def save(self):
+        """Keep the template for later runs and the http engine."""
+        if self.ledger is not None and self.template:
+            self.ledger.set_meta(self._meta_key, json.dumps(self.template))
+
+    def use_browser_session(self, driver):
+        """Send direct requests with the browser's cookies and user agent."""
+        if self.session is None:
+            self.session = create_session()
+        copy_browser_session(driver, self.session)
+
+    def forget(self):
+        """Drop a template that no longer works."""
+        self.template = None
+        if self.ledger is not None:
+            self.ledger.set_meta(self._meta_key, None)
+
+    def fetch(self, page):
+        """Fetch a list page directly and return its article records (title, url, date, category), or None."""
+        if not self.template:
+            return None
+        if self.session is None:
+            self.session = create_session()
+
+        template = self.template
+        page_value = str(page)
+        parts = urlsplit(template['url'])
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        body = template['body']
+
+        if template['location'] == 'query':
+            query = [(k, page_value if k == template['param'] else v) for k, v in query]
+        elif template['location'] == 'form':
+            body = urlencode([(k, page_value if k == template['param'] else v)
+                              for k, v in parse_qsl(body, keep_blank_values=True)])
+        else:
+            data = json.loads(body)
+            # Keep the original type of the parameter
+            data[template['param']] = page if isinstance(data[template['param']], int) else page_value
+            body = json.dumps(data)
+        url = urlunsplit(parts._replace(query=urlencode(query)))
+
+        headers = {'Referer': template.get('referer') or self.base_url}
+        if template.get('kind') == 'xhr':
+            headers['X-Requested-With'] = 'XMLHttpRequest'
+        if body is not None:
+            headers['Content-Type'] = ('application/json' if template['location'] == 'json'
+                                       else 'application/x-www-form-urlencoded; charset=UTF-8')
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            response = self.session.request(template['method'], url, data=body, headers=headers,
+                                            timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {page} directly: {e}")
+            if self.rate_limiter is not None:
+                self.rate_limiter.feedback(url, None)
+            return None
+        if self.rate_limiter is not None:
+            self.rate_limiter.observe(url, response)
+        if response.status_code != 200:
+            print(f"Direct fetch of page {page} failed. Status code: {response.status_code}")
+            return None
+        if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+
+        page_url = template.get('referer') or self.base_url
+        return [{'title': article['title'], 'url': urljoin(page_url, article['href']),
+                 'date': article['date'], 'category': article['category']}
+                for article in self._parse_articles(response.text)] or None
+
+    def _parse_articles(self, text):
+        """Extract the articles of an HTML or JSON list response, as ListPageParser.articles."""
+        try:
+            markup = ''.join(_html_fragments(json.loads(text)))
+        except ValueError:
+            markup = text
+
+        # Fragments often omit the list container (e.g. #topdownlist) the full page has
+        tag, element_id, classes = parse_selector(self.site.list_container)[-1]
+        attributes = f' id="{element_id}"' if element_id else ''
+        if classes:
+            attributes += f' class="{" ".join(classes)}"'
+        wrapper = tag or 'div'
+        for html in (markup, f'<{wrapper}{attributes}>{markup}</{wrapper}>'):
+            parser = ListPageParser(self.site)
+            parser.feed(html)
+            parser.close()
+            if parser.articles:
+                return parser.articles
+        return []
@@ -0,0 +1,191 @@
+import re
+from html.parser import HTMLParser
+
+from pdf_downloader import extract_pdf_path, is_pdf_link_text
+from site_profiles import DEFAULT_SITE
+
+# A date in a list item, e.g. 2025-03-01, 2025.3.1 or 2025年3月1日
+DATE_PATTERN = re.compile(r'\d{4}[-./年]\d{1,2}[-./月]\d{1,2}')
+
+# Elements that never have a closing tag and must not be kept on the stack
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+             'param', 'source', 'track', 'wbr'}
+
+
+class _StackParser(HTMLParser):
+    """HTMLParser that keeps track of the currently open elements."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._stack = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self.on_start(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._stack.append((tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.on_start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        # Pop up to the matching element, tolerating unclosed tags in between
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                for open_tag, open_attrs in reversed(self._stack[i:]):
+                    self.on_end(open_tag, open_attrs)
+                del self._stack[i:]
+                return
+
+    def on_start(self, tag, attrs):
+        pass
+
+    def on_end(self, tag, attrs):
+        pass
+
+    def _inside(self, tag=None, element_id=None, classes=()):
+        """Check whether any open element matches the given tag, id and classes."""
+        for open_tag, attrs in self._stack:
+            if _matches(open_tag, attrs, tag, element_id, classes):
+                return True
+        return False
+
+
+def parse_selector(selector):
+    """Split a "tag#id.class other.class" selector into (tag, id, classes) compounds."""
+    compounds = []
+    for part in selector.split():
+        tag, element_id, classes = '', None, []
+        for piece in part.replace('#', ' #').replace('.', ' .').split():
+            if piece.startswith('#'):
+                element_id = piece[1:]
+            elif piece.startswith('.'):
+                classes.append(piece[1:])
+            else:
+                tag = piece.lower()
+        compounds.append((tag or None, element_id, tuple(classes)))
+    return compounds
+
+
+def _matches(tag, attrs, want_tag=None, element_id=None, classes=()):
+    """Check an element against a simple tag#id.class selector."""
+    if want_tag and tag != want_tag:
+        return False
+    if element_id and attrs.get('id') != element_id:
+        return False
+    element_classes = (attrs.get('class') or '').split()
+    return all(cls in element_classes for cls in classes)
+
+
+class ListPageParser(_StackParser):
+    """Collect article links (e.g. #topdownlist li.listp a), their list metadata and the page count.
+
+    `links` holds (title, href) pairs; `articles` holds the same links as
+    dicts with the date and category shown in the link's list item, found
+    as the browser's link harvest finds them.
+    """
+
+    def __init__(self, site=DEFAULT_SITE):
+        super().__init__()
+        self.links = []
+        self.articles = []
+        self.page_info_text = None
+        self._link = None
+        self._page_info = None
+        self._item = None
+        *self._link_ancestors, self._link_element = parse_selector(site.link_selector)
+        # Only the last compound of the item and page count selectors is checked
+        self._item_element = parse_selector(site.item_selector)[-1]
+        self._page_count = parse_selector(site.page_count_selector)[-1]
+
+    def on_start(self, tag, attrs):
+        if (_matches(tag, attrs, *self._link_element)
+                and all(self._inside(*ancestor) for ancestor in self._link_ancestors)):
+            self._link = {'href': attrs.get('href'), 'text': []}
+        elif _matches(tag, attrs, *self._page_count):
+            self._page_info = []
+        elif self._item is None and _matches(tag, attrs, *self._item_element):
+            self._item = {'attrs': attrs, 'text': [], 'articles': [], 'date': None, 'category': None,
+                          'field': None}
+        elif self._item is not None and self._item['field'] is None:
+            classes = (attrs.get('class') or '').lower()
+            if 'date' in classes or 'time' in classes:
+                self._item['field'] = ('date', attrs, [])
+            elif 'categ' in classes or 'type' in classes or 'column' in classes:
+                self._item['field'] = ('category', attrs, [])
+
+    def on_end(self, tag, attrs):
+        if tag == 'a' and self._link is not None:
+            title = ' '.join(''.join(self._link['text']).split())
+            if self._link['href']:
+                self.links.append((title, self._link['href']))
+                article = {'title': title, 'href': self._link['href'], 'date': None, 'category': None}
+                self.articles.append(article)
+                if self._item is not None:
+                    self._item['articles'].append(article)
+            self._link = None
+        elif self._page_info is not None and _matches(tag, attrs, *self._page_count):
+            self.page_info_text = ''.join(self._page_info).strip()
+            self._page_info = None
+        elif self._item is not None and self._item['field'] and self._item['field'][1] is attrs:
+            name, _, text = self._item['field']
+            if self._item[name] is None:
+                self._item[name] = ' '.join(''.join(text).split())
+            self._item['field'] = None
+        elif self._item is not None and self._item['attrs'] is attrs:
+            self._close_item()
+
+    def _close_item(self):
+        """Give the links of a finished list item its date and category."""
+        item, self._item = self._item, None
+        match = DATE_PATTERN.search(item['date'] or ''.join(item['text']))
+        for article in item['articles']:
+            article['date'] = match.group() if match else None
+            article['category'] = item['category'] or None
+
+    def handle_data(self, data):
+        if self._link is not None:
+            self._link['text'].append(data)
+        elif self._item is not None:
+            self._item['text'].append(data)
+            if self._item['field'] is not None:
+                self._item['field'][2].append(data)
+        if self._page_info is not None:
+            self._page_info.append(data)
+
+
+class ArticlePageParser(_StackParser):
+    """Collect the file URL prefix and PDF references from an article page."""
+
+    def __init__(self, site=DEFAULT_SITE):
+        super().__init__()
+        self.site = site
+        self.file_url_prefix = None
+        self.pdf_paths = []
+        self.pdf_links = []
+        self._pdf_link = None
+
+    def on_start(self, tag, attrs):
+        if tag == 'input' and attrs.get('id') == self.site.file_prefix_id:
+            self.file_url_prefix = attrs.get('value')
+
+        onclick = attrs.get('onclick')
+        if onclick and self.site.pdf_function in onclick:
+            pdf_path = extract_pdf_path(onclick, self.site.pdf_function)
+            if pdf_path and pdf_path not in self.pdf_paths:
+                self.pdf_paths.append(pdf_path)
+
+        # Kept on the closing tag if the link text names it as a download
+        href = attrs.get('href')
+        if tag == 'a' and href and href.lower().endswith('.pdf') and href not in self.pdf_links:
+            self._pdf_link = {'href': href, 'text': []}
+
+    def on_end(self, tag, attrs):
+        if tag == 'a' and self._pdf_link is not None:
+            if is_pdf_link_text(''.join(self._pdf_link['text']), self.site.pdf_link_words):
+                self.pdf_links.append(self._pdf_link['href'])
+            self._pdf_link = None
+
+    def handle_data(self, data):
+        if self._pdf_link is not None:
+            self._pdf_link['text'].append(data)
@@ -0,0 +1,162 @@
+import queue
+import multiprocessing
+import os
+
+from main_crawler import GuidanceCrawler
+from pdf_downloader import PDFDownloader
+from download_pool import DownloadPool, QueueSink
+from crawl_ledger import CrawlLedger
+from metrics import CrawlMetrics
+from rate_limiter import RateLimiter
+from manifest import CrawlManifest, MANIFEST_FILENAME, follow
+
+METRICS_FILENAME = "crawl_metrics.json"
+
+
+def split_pages(first_page, last_page, shards):
+    """Split first_page..last_page into at most `shards` contiguous (first, last) ranges."""
+    total = last_page - first_page + 1
+    shards = max(1, min(shards, total))
+    size, extra = divmod(total, shards)
+    ranges = []
+    start = first_page
+    for i in range(shards):
+        end = start + size - 1 + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def _crawl_shard(base_url, download_dir, headless, first_page, last_page, download_queue, resume,
+                 browser_profile, rate_settings):
+    """Worker process: crawl one page range with its own browser."""
+    try:
+        # Hand resolved PDF URLs to the coordinator instead of downloading here
+        crawler = GuidanceCrawler(base_url, download_dir, headless, download_workers=0,
+                                  resume=resume, end_page=last_page,
+                                  download_pool=QueueSink(download_queue),
+                                  browser_profile=browser_profile,
+                                  metrics_filename=f"crawl_metrics_pages_{first_page}-{last_page}.json",
+                                  rate_limiter=RateLimiter(**rate_settings))
+        crawler.current_page = first_page
+        crawler.start()
+    except Exception as e:
+        print(f"[pages {first_page}-{last_page}] Worker failed: {e}")
+    finally:
+        # Tell the coordinator this worker is finished
+        download_queue.put(None)
+
+
+class ParallelCrawler:
+    def __init__(self, base_url, download_dir='downloads', headless=True, browsers=2,
+                 download_workers=4, resume=False, browser_profile='default', progress_interval=None,
+                 rate_limiter=None, layout='flat', segment_threshold=None, segments=4):
+        """Initialize a crawl split across several browser processes."""
+        self.base_url = base_url
+        self.current_page = 1
+        self.total_pages = None
+        self.download_dir = download_dir
+        self.headless = headless
+        self.browsers = max(1, browsers)
+        self.resume = resume
+        self.browser_profile = browser_profile
+
+        # Create download directory if it doesn't exist
+        if not os.path.exists(download_dir):
+            os.makedirs(download_dir)
+
+        # The browsers and the downloads here each get an equal share of the requested rate,
+        # so together they stay within it; the downloads share this limiter
+        rate_limiter = rate_limiter or RateLimiter()
+        self.rate_settings = rate_limiter.share(self.browsers + 1)
+        self.rate_limiter = RateLimiter(**self.rate_settings)
+
+        # Downloads for all workers happen here, in one shared pool, sized for the most the
+        # rate limiter lets run at once
+        self.ledger = CrawlLedger(download_dir)
+        self.download_pool = None
+        if download_workers > 0:
+            self.download_pool = DownloadPool(self.rate_limiter.max_concurrency)
+        # Covers the downloads; each worker reports its own browsing metrics
+        self.metrics = CrawlMetrics()
+        self.progress_interval = progress_interval
+        self.pdf_downloader = PDFDownloader(None, download_dir, self.download_pool, self.ledger,
+                                            metrics=self.metrics, rate_limiter=self.rate_limiter,
+                                            layout=layout, segment_threshold=segment_threshold,
+                                            segments=segments)
+        # Downloads are logged here; workers append their failed articles to the same file
+        self.manifest = CrawlManifest(os.path.join(download_dir, MANIFEST_FILENAME))
+        self.pdf_downloader.add_listener(self.manifest.write)
+
+    def _get_total_pages(self):
+        """Open the site once to read the total number of pages."""
+        probe = GuidanceCrawler(self.base_url, self.download_dir, self.headless, download_workers=0,
+                                ledger=self.ledger, browser_profile=self.browser_profile,
+                                rate_limiter=self.rate_limiter, manifest=self.manifest)
+        try:
+            self.rate_limiter.wait(self.base_url)
+            probe.driver.get(self.base_url)
+            probe.readiness.document_ready('initial_load')
+            return probe._get_total_pages()
+        finally:
+            probe.tab_pool.close()
+
+    def start(self):
+        """Start the worker processes and download everything they resolve."""
+        try:
+            self.metrics.start_progress(self.progress_interval)
+            self.total_pages = self._get_total_pages()
+            print(f"Total pages found: {self.total_pages}")
+            if self.current_page > self.total_pages:
+                print(f"Start page {self.current_page} is beyond the last page")
+                return
+
+            shards = split_pages(self.current_page, self.total_pages, self.browsers)
+            download_queue = multiprocessing.Queue()
+            workers = []
+            for first_page, last_page in shards:
+                print(f"Starting browser for pages {first_page}-{last_page}")
+                worker = multiprocessing.Process(
+                    target=_crawl_shard,
+                    args=(self.base_url, self.download_dir, self.headless, first_page, last_page,
+                          download_queue, self.resume, self.browser_profile,
+                          self.rate_settings))
+                worker.start()
+                workers.append(worker)
+
+            self._consume(download_queue, workers)
+
+            for worker in workers:
+                worker.join()
+        finally:
+            # Let queued downloads finish before returning
+            if self.download_pool is not None:
+                self.download_pool.drain()
+            self.rate_limiter.report()
+            self.metrics.stop_progress()
+            self.metrics.report(os.path.join(self.download_dir, METRICS_FILENAME))
+            self.manifest.close()
+            self.ledger.close()
+
+    def results(self):
+        """Run the crawl in the background and yield each download record as it is written."""
+        return follow(self.manifest, self.start)
+
+    def _consume(self, download_queue, workers):
+        """Download PDFs from the shared queue until every worker is finished."""
+        finished = 0
+        while finished < len(workers):
+            try:
+                item = download_queue.get(timeout=5)
+            except queue.Empty:
+                # A worker that died without saying goodbye won't send anything more
+                if not any(worker.is_alive() for worker in workers):
+                    break
+                continue
+
+            if item is None:
+                finished += 1
+                continue
+
+            url, title, article_url = item
+            self.pdf_downloader._dispatch_download(url, title, article_url)
@@ -1,144 +1,580 @@
 import time
 import os
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import glob
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from content_store import ContentStore
+from metrics import CrawlMetrics
+from rate_limiter import RateLimiter, retry_after_seconds
+from http_session import create_session, copy_browser_session
+from site_profiles import DEFAULT_SITE
+from storage_layout import StorageLayout
+
+
+# Collects everything that can lead to a PDF in one round-trip instead of several per element
+PDF_CANDIDATES_SCRIPT = """
+var prefix = document.getElementById(arguments[0]);
+var elements = document.querySelectorAll('[onclick*="' + arguments[1] + '"], a[href$=".pdf" i]');
+return {
+    url: window.location.href,
+    prefix: prefix ? prefix.value : null,
+    candidates: Array.prototype.map.call(elements, function (el) {
+        return {
+            tag: el.tagName.toLowerCase(),
+            text: (el.textContent || '').trim().slice(0, 200),
+            href: el.tagName === 'A' && el.getAttribute('href') ? el.href : null,
+            onclick: el.getAttribute('onclick')
+        };
+    })
+};
+"""
+
+
+class IncompleteDownloadError(Exception):
+    """Raised when a download ends before the advertised Content-Length."""
+
+
+def extract_pdf_path(onclick, function='downpdfbyname'):
+    """Return the PDF path passed to downpdfbyname(...) (or the site's function) in an onclick handler."""
+    # Example: downpdfbyname('cms/news/info/052e1f33-a08a-4877-ac79-f08b7cfa1b35.pdf','2025 ESGAR共识声明：原发性硬化性胆管炎的MR成像)
+    match = re.search(re.escape(function) + r"\(\s*['\"]([^'\"]+)['\"]", onclick or '')
+    return match.group(1) if match else None
+
+
+def is_pdf_link_text(text, words):
+    """Check whether a link's text names it as a download (e.g. "PDF", "下载"), ignoring case."""
+    text = (text or '').lower()
+    return any(word.lower() in text for word in words)
+
+
+def build_pdf_url(page_url, file_url_prefix, pdf_path, marker='/custom/'):
+    """Build the absolute PDF URL from the article page URL and the file prefix."""
+    base_url = page_url.split(marker)[0]  # Get base domain
+    return f"{base_url}{file_url_prefix}{pdf_path}"
+
+
+def resolve_pdf_urls(page_url, file_url_prefix, pdf_paths, pdf_links, marker='/custom/'):
+    """Return the article's PDF URLs without duplicates, downpdfbyname(...) paths first."""
+    urls = [build_pdf_url(page_url, file_url_prefix, pdf_path, marker) for pdf_path in pdf_paths]
+    urls += [urljoin(page_url, href) for href in pdf_links]
+    return list(dict.fromkeys(urls))
 
 
 class PDFDownloader:
-    def __init__(self, driver, download_dir="downloads"):
+    def __init__(self, driver, download_dir="downloads", download_pool=None, ledger=None,
+                 chunk_size=64 * 1024, buffer_size=1024 * 1024, segment_threshold=None, segments=4,
+                 metrics=None, rate_limiter=None, session=None, site=DEFAULT_SITE, layout='flat'):
         """Initialize the PDF downloader."""
         self.driver = driver
+        # Where the site keeps its file prefix and PDF links
+        self.site = site
         self.download_dir = download_dir
+        # Optional DownloadPool; when set, downloads run in the background
+        self.download_pool = download_pool
+        # Optional CrawlLedger recording each download's outcome
+        self.ledger = ledger
+        # Bytes read from the network per chunk, and the file write buffer size
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        # Files at least this large are fetched as parallel ranges (None disables it)
+        self.segment_threshold = segment_threshold
+        self.segments = max(1, segments)
+
+        # One download per URL at a time, since attempts share the partial file
+        self._url_locks = {}
+        self._url_locks_lock = threading.Lock()
 
         # Create download directory if it doesn't exist
         if not os.path.exists(download_dir):
             os.makedirs(download_dir)
 
-    def find_and_download_pdf(self, title):
-        """Find PDF elements and attempt to download them."""
+        # Unique PDFs are stored once by hash and linked under their titles
+        self.store = ContentStore(download_dir)
+        # Where each PDF appears under its title: 'flat', 'hash' or 'date', or a shared StorageLayout
+        self.layout = layout if isinstance(layout, StorageLayout) else StorageLayout(download_dir, ledger, layout)
+        self.metrics = metrics or CrawlMetrics()
+        # Paces every request to the host and adapts to 429s and server errors
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # One keep-alive session for every download, with room for all workers and segments
+        workers = getattr(download_pool, 'max_workers', 1)
+        self.session = session or create_session(workers * (self.segments if segment_threshold else 1))
+        # Browser whose cookies and user agent the session carries
+        self._session_driver = None
+        # Called with a record of each finished download (see add_listener)
+        self.listeners = []
+        # Optional ArticleInfo, told how many PDFs each article queues
+        self.article_info = None
+
+    def find_and_download_pdf(self, title, article_url=None):
+        """Find every PDF on the article page in one script call and download them."""
         try:
-            # Look for elements with PDF-related text
-            elements = self.driver.find_elements(By.XPATH,
-                                                 "//*[contains(text(), 'PDF') or contains(text(), 'pdf') or contains(text(), '下载') or contains(text(), 'Download')]")
+            started = time.monotonic()
+            page = self.driver.execute_script(PDF_CANDIDATES_SCRIPT, self.site.file_prefix_id,
+                                              self.site.pdf_function) or {}
+            page_url = page.get('url') or self.driver.current_url
+            article_url = article_url or page_url
+            candidates = page.get('candidates') or []
 
-            if not elements:
+            if not candidates:
                 print("No PDF download elements found on this page")
                 return False
 
-            print(f"Found {len(elements)} potential PDF elements by text content")
+            print(f"Found {len(candidates)} potential PDF elements")
+            for i, candidate in enumerate(candidates):
+                print(f"  Element {i + 1}: <{candidate.get('tag')}> '{candidate.get('text')}' "
+                      f"href='{candidate.get('href')}' onclick='{candidate.get('onclick')}'")
 
-            # Try to get the file URL prefix from hidden input field
-            try:
-                file_url_prefix = self.driver.find_element(By.ID, "fileurls").get_attribute('value')
+            file_url_prefix = page.get('prefix')
+            if file_url_prefix:
                 print(f"Found file URL prefix: {file_url_prefix}")
-            except:
-                file_url_prefix = "/fileLCGDBZZ/"  # Default fallback if not found
+            else:
+                file_url_prefix = self.site.default_file_prefix  # Default fallback if not found
                 print(f"Using default file URL prefix: {file_url_prefix}")
 
-            for i, element in enumerate(elements):
-                tag_name = element.tag_name
-                text = element.text
-                href = element.get_attribute('href')
-                onclick = element.get_attribute('onclick')
-
-                print(f"  Element {i + 1} tag: {tag_name}")
-                print(f"  Element {i + 1} text: '{text}'")
-                print(f"  Element {i + 1} href: '{href}'")
-                print(f"  Element {i + 1} onclick: '{onclick}'")
-
-                # Look for JavaScript onclick attribute that calls downpdfbyname
-                if onclick and 'downpdfbyname' in onclick:
-                    # Extract the PDF path from the function call
-                    try:
-                        # Example: downpdfbyname('cms/news/info/052e1f33-a08a-4877-ac79-f08b7cfa1b35.pdf','2025 ESGAR共识声明：原发性硬化性胆管炎的MR成像)
-                        import re
-                        pdf_path_match = re.search(r"downpdfbyname\('([^']+)'", onclick)
-
-                        if pdf_path_match:
-                            pdf_path = pdf_path_match.group(1)
-                            base_url = self.driver.current_url.split('/custom/')[0]  # Get base domain
-                            pdf_url = f"{base_url}{file_url_prefix}{pdf_path}"
-
-                            print(f"Constructed PDF URL: {pdf_url}")
-                            sanitized_title = self._sanitize_filename(title)
-                            self._download_pdf_from_url(pdf_url, sanitized_title)
-                            return True
-                    except Exception as e:
-                        print(f"Error extracting PDF path from onclick: {e}")
-
-                # Check if element is a direct link to PDF
-                elif href and href.lower().endswith('.pdf'):
-                    sanitized_title = self._sanitize_filename(title)
-                    self._download_pdf_from_url(href, sanitized_title)
-                    return True
-
-            # If we get here, we found elements but couldn't download the PDF
-            print("Found potential PDF elements but couldn't determine how to download")
-            return False
+            pdf_paths = []
+            for candidate in candidates:
+                pdf_path = extract_pdf_path(candidate.get('onclick'), self.site.pdf_function)
+                if pdf_path and pdf_path not in pdf_paths:
+                    pdf_paths.append(pdf_path)
+            pdf_links = [candidate['href'] for candidate in candidates
+                         if candidate.get('href') and candidate['href'].lower().endswith('.pdf')
+                         and is_pdf_link_text(candidate.get('text'), self.site.pdf_link_words)]
+            pdf_urls = resolve_pdf_urls(page_url, file_url_prefix, pdf_paths, pdf_links,
+                                        self.site.article_path_marker)
+            self.metrics.record('pdf_discovery', time.monotonic() - started)
+            self._use_browser_session()
+
+            if not pdf_urls:
+                # We found elements but couldn't download the PDF
+                print("Found potential PDF elements but couldn't determine how to download")
+                return False
+            return self.dispatch_all(pdf_urls, title, article_url)
 
         except Exception as e:
             print(f"Error finding and downloading PDF: {e}")
             return False
 
+    def dispatch_all(self, pdf_urls, title, article_url=None):
+        """Download every PDF of an article; the second and later get a numbered title."""
+        sanitized_title = self._sanitize_filename(title)
+        if self.ledger is not None and article_url and pdf_urls:
+            # All of them first, so the article isn't done when only the first one is
+            self.ledger.queue_downloads(pdf_urls, article_url)
+        if self.article_info is not None and article_url:
+            self.article_info.expect(article_url, len(pdf_urls))
+        for i, pdf_url in enumerate(pdf_urls):
+            print(f"Constructed PDF URL: {pdf_url}")
+            pdf_title = sanitized_title if i == 0 else f"{sanitized_title} ({i + 1})"
+            self._dispatch_download(pdf_url, pdf_title, article_url)
+        return True
+
+    def _dispatch_download(self, url, title, article_url=None):
+        """Download a PDF now, or hand it to the download pool if one is set."""
+        if self.download_pool is not None:
+            print(f"Queued PDF for download: {url}")
+            self.download_pool.submit(self._download_pdf_from_url, url, title, article_url=article_url)
+            return True
+        return self._download_pdf_from_url(url, title, article_url=article_url)
+
     def _sanitize_filename(self, filename):
         """Remove invalid characters from filename."""
-        import re
         # Replace invalid filename characters with underscores
         return re.sub(r'[\\/*?:"<>|]', "_", filename)
 
-    def _download_pdf_from_url(self, url, title, max_retries=3, retry_delay=5):
-        """Download a PDF from a URL using requests with retry mechanism."""
-        import requests
-        from urllib.parse import urlparse
-        import time
-        import os
+    def _target_filename(self, url, title):
+        """Pick the local filename for a PDF."""
+        # If the URL doesn't end with .pdf, get filename from parsed URL
+        if not url.lower().endswith('.pdf'):
+            parsed_url = urlparse(url)
+            path_parts = parsed_url.path.split('/')
+            filename = next((part for part in reversed(path_parts) if part.lower().endswith('.pdf')),
+                            None)
+            if not filename:
+                filename = f"{title}.pdf"
+        else:
+            filename = f"{title}.pdf"
+        return filename
+
+    def _download_pdf_from_url(self, url, title, max_retries=3, retry_delay=5, article_url=None):
+        """Download a PDF and record the outcome in the ledger."""
+        with self._url_locks_lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+
+        with url_lock:
+            previous = self.ledger.get_download(url) if self.ledger is not None else None
+            filepath = self.layout.path_for(url, self._target_filename(url, title), article_url)
+            started = time.monotonic()
+            with self.metrics.phase('download'):
+                result = self._fetch_pdf(url, filepath, max_retries, retry_delay, previous)
+            seconds = time.monotonic() - started
+            self.metrics.count('pdfs_ok' if result else 'pdfs_failed')
+
+            if self.ledger is not None:
+                if result:
+                    self.ledger.record_download(url, article_url, 'done', result['path'],
+                                                result['size'], result['sha256'], etag=result['etag'],
+                                                last_modified=result['last_modified'])
+                else:
+                    self.ledger.record_download(url, article_url, 'failed', error="download failed")
+
+        self._notify({'pdf_url': url, 'article_url': article_url, 'title': title,
+                      'status': 'done' if result else 'failed',
+                      'path': result['path'] if result else None,
+                      'size': result['size'] if result else None,
+                      'sha256': result['sha256'] if result else None,
+                      'download_s': round(seconds, 3)})
+        return bool(result)
+
+    def add_listener(self, callback):
+        """Call `callback(record)` after every download attempt, e.g. to index or list the PDF."""
+        self.listeners.append(callback)
+
+    def _notify(self, record):
+        """Pass a finished download to the listeners."""
+        for callback in list(self.listeners):
+            try:
+                callback(record)
+            except Exception as e:
+                print(f"Error in download listener: {e}")
+
+    def _reuse_stored(self, previous, filepath):
+        """Link an unchanged, already stored PDF under its title instead of refetching it."""
+        self.store.link(self.store.object_path(previous['sha256']), filepath)
+        print(f"PDF unchanged since last run, skipping download: {filepath}")
+        self.metrics.count('pdfs_unchanged')
+        return {'path': filepath, 'size': previous['size'], 'sha256': previous['sha256'],
+                'etag': previous['etag'], 'last_modified': previous['last_modified']}
+
+    def _use_browser_session(self):
+        """Download with the browser's cookies and user agent, once per browser."""
+        if self.driver is None or self.driver is self._session_driver:
+            return
+        try:
+            copy_browser_session(self.driver, self.session)
+            self._session_driver = self.driver
+        except Exception as e:
+            print(f"Could not copy the browser session: {e}")
+
+    def _request(self, method, url, **kwargs):
+        """Send one HTTP request through the rate limiter and report how the host answered."""
+        self.rate_limiter.wait(url)
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.rate_limiter.feedback(url, None)
+            raise
+        self.rate_limiter.observe(url, response)
+        return response
+
+    def _remote_size_matches(self, url, headers, size):
+        """Check with a HEAD request whether the remote file still has the recorded size."""
+        try:
+            response = self._request('HEAD', url, headers=headers, timeout=30, allow_redirects=True)
+            content_length = response.headers.get('Content-Length')
+            return (response.status_code == 200 and content_length is not None
+                    and int(content_length) == size)
+        except (requests.exceptions.RequestException, ValueError):
+            return False
+
+    def _probe_segmentable(self, url, headers):
+        """Return the HEAD response of a file worth a segmented download, or None.
+
+        Segments are joined across attempts and runs, so the file must have
+        a strong validator to check them against.
+        """
+        try:
+            response = self._request('HEAD', url, headers=headers, timeout=30, allow_redirects=True)
+            content_length = response.headers.get('Content-Length', '')
+            if (response.status_code == 200 and content_length.isdigit()
+                    and response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                    and int(content_length) >= self.segment_threshold
+                    and self._validator(response)):
+                return response
+        except requests.exceptions.RequestException:
+            pass
+        return None
+
+    def _read_validator(self, part_path):
+        """Return the ETag/Last-Modified saved for a partial download, if any."""
+        try:
+            with open(f"{part_path}.validator", encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _validator(self, response):
+        """Return the strong ETag or Last-Modified of a response, usable with If-Range, or None."""
+        validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+        return validator if validator and not validator.startswith('W/') else None
+
+    def _write_validator(self, part_path, response):
+        """Remember which version of the file a partial download belongs to."""
+        validator = self._validator(response)
+        if validator:
+            with open(f"{part_path}.validator", 'w', encoding='utf-8') as f:
+                f.write(validator)
+
+    def _discard_partial(self, part_path):
+        """Delete a partial download, its segments and its validator."""
+        segments = glob.glob(f"{glob.escape(part_path)}.[0-9]*")
+        for path in [part_path, f"{part_path}.validator"] + segments:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _finish_partial(self, part_path, sha256):
+        """Move a completed partial download into the store."""
+        if os.path.exists(f"{part_path}.validator"):
+            os.remove(f"{part_path}.validator")
+        return self.store.add(part_path, sha256)
+
+    def _hash_partial(self, part_path, digest):
+        """Feed a partial download into `digest` and return its first four bytes."""
+        with open(part_path, 'rb') as f:
+            head = f.read(4)
+            f.seek(0)
+            for block in iter(lambda: f.read(self.chunk_size), b''):
+                digest.update(block)
+        return head
+
+    def _stream_to_store(self, response, part_path, offset=0):
+        """Stream a response into the store without holding the body in memory.
+
+        A 206 response is appended to the `offset` bytes already in
+        `part_path`; anything else rewrites the partial file from the start.
+        The partial file is kept if the transfer breaks off so the next
+        attempt can resume it. Returns (object_path, size, sha256), or None
+        if the body is not a PDF.
+        """
+        content_type = response.headers.get('Content-Type', '').lower()
+        chunks = response.iter_content(chunk_size=self.chunk_size)
+        digest = hashlib.sha256()
+
+        if response.status_code == 206 and offset:
+            # Content-Range: bytes <start>-<end>/<total>
+            content_range = response.headers.get('Content-Range', '')
+            match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', content_range)
+            if not match or int(match.group(1)) != offset:
+                self._discard_partial(part_path)
+                raise IncompleteDownloadError(f"Unexpected Content-Range: {content_range}")
+            expected = match.group(2)
+
+            # Hash what we already have so the digest covers the whole file
+            head = self._hash_partial(part_path, digest)
+            print(f"Resuming download at byte {offset}")
+            mode, size = 'ab', offset
+        else:
+            # Sniff the magic bytes from the start of the stream
+            head = b''
+            for chunk in chunks:
+                head += chunk
+                if len(head) >= 4:
+                    break
+            # Content-Length is the encoded size, so only compare unencoded bodies
+            expected = None
+            if 'Content-Encoding' not in response.headers:
+                expected = response.headers.get('Content-Length')
+            digest.update(head)
+            mode, size = 'wb', len(head)
+
+        if 'application/pdf' not in content_type and not head.startswith(b'%PDF'):
+            response.close()
+            self._discard_partial(part_path)
+            return None
+
+        if mode == 'wb':
+            self._write_validator(part_path, response)
+        with open(part_path, mode, buffering=self.buffer_size) as f:
+            if mode == 'wb':
+                f.write(head)
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+
+        if expected and expected.isdigit() and size != int(expected):
+            if size > int(expected):
+                self._discard_partial(part_path)
+            raise IncompleteDownloadError(f"Got {size} of {expected} bytes")
+
+        sha256 = digest.hexdigest()
+        return self._finish_partial(part_path, sha256), size, sha256
+
+    def _download_segmented(self, url, headers, part_path, probe):
+        """Download a large file as parallel byte ranges, then join and hash it.
+
+        Each segment is kept in its own partial file so a failed attempt
+        only refetches the missing bytes. Segments left from another version
+        of the file are discarded, and every range request carries If-Range,
+        so a file that changes midway is never joined from mixed versions.
+        Returns (object_path, size, sha256), or None if the body is not a PDF.
+        """
+        total = int(probe.headers['Content-Length'])
+        validator = self._validator(probe)
+        if self._read_validator(part_path) != validator:
+            self._discard_partial(part_path)
+            self._write_validator(part_path, probe)
+
+        segment_size = -(-total // self.segments)
+        ranges = [(start, min(start + segment_size, total) - 1)
+                  for start in range(0, total, segment_size)]
+
+        def fetch_segment(index, start, end):
+            segment_path = f"{part_path}.{index}"
+            have = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+            if have < end - start + 1:
+                segment_headers = dict(headers)
+                segment_headers['Range'] = f"bytes={start + have}-{end}"
+                segment_headers['If-Range'] = validator
+                # Each segment is a connection of its own, so it needs a slot of its own
+                with self.rate_limiter.slot(url), \
+                        self._request('GET', url, headers=segment_headers, stream=True, timeout=30) as response:
+                    if response.status_code == 200:
+                        # If-Range didn't match: the file changed since the HEAD request
+                        self._discard_partial(part_path)
+                        raise IncompleteDownloadError("Remote file changed during segmented download")
+                    if response.status_code != 206:
+                        raise IncompleteDownloadError(
+                            f"Server ignored range request (status {response.status_code})")
+                    with open(segment_path, 'ab', buffering=self.buffer_size) as f:
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            if chunk:
+                                f.write(chunk)
+            if os.path.getsize(segment_path) != end - start + 1:
+                raise IncompleteDownloadError(f"Segment {index} is incomplete")
+
+        print(f"Downloading {total} bytes in {len(ranges)} parallel segments")
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [executor.submit(fetch_segment, i, start, end)
+                       for i, (start, end) in enumerate(ranges)]
+            for future in futures:
+                future.result()
+
+        # Join the segments into one partial file, hashing as we go
+        digest = hashlib.sha256()
+        with open(part_path, 'wb', buffering=self.buffer_size) as out:
+            for index in range(len(ranges)):
+                segment_path = f"{part_path}.{index}"
+                with open(segment_path, 'rb') as f:
+                    for block in iter(lambda: f.read(self.chunk_size), b''):
+                        out.write(block)
+                        digest.update(block)
+                os.remove(segment_path)
+
+        with open(part_path, 'rb') as f:
+            if f.read(4) != b'%PDF':
+                self._discard_partial(part_path)
+                return None
+
+        sha256 = digest.hexdigest()
+        return self._finish_partial(part_path, sha256), total, sha256
+
+    def _fetch_pdf(self, url, filepath, max_retries=3, retry_delay=5, previous=None):
+        """Download a PDF from a URL to `filepath` using requests with retry mechanism.
+
+        Returns a dict with path, size, sha256, etag and last_modified on
+        success and False otherwise. `previous` is the ledger row from an
+        earlier run and is used to revalidate instead of refetching.
+        """
+        # PDFs are already compressed, and byte ranges must match the bytes we store
+        base_headers = {'Accept-Encoding': 'identity'}
+        headers = dict(base_headers)
+        # Interrupted transfers are kept here and resumed with Range requests
+        part_path = self.store.partial_path(url)
+
+        # Revalidate a PDF we already have instead of downloading it again
+        stored = previous is not None and previous['status'] == 'done' and self.store.has(previous['sha256'])
+        if stored:
+            if previous['etag']:
+                headers['If-None-Match'] = previous['etag']
+            if previous['last_modified']:
+                headers['If-Modified-Since'] = previous['last_modified']
+            if 'If-None-Match' not in headers and 'If-Modified-Since' not in headers:
+                if self._remote_size_matches(url, headers, previous['size']):
+                    return self._reuse_stored(previous, filepath)
 
         retry_count = 0
         while retry_count < max_retries:
             try:
                 print(f"Attempting to download PDF from: {url} (Attempt {retry_count + 1}/{max_retries})")
+                transfer_started = time.monotonic()
 
-                # Make the GET request with timeout
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                }
-                response = requests.get(url, headers=headers, stream=True, timeout=30)
+                # Large files can be fetched as parallel byte ranges; probed every attempt
+                # so a file that changed is fetched as its new version
+                probe = None
+                if self.segment_threshold and not stored:
+                    probe = self._probe_segmentable(url, base_headers)
 
-                # Check if the response is valid
-                if response.status_code == 200:
-                    # Check if content is actually a PDF (by checking Content-Type or first few bytes)
-                    content_type = response.headers.get('Content-Type', '').lower()
-
-                    if 'application/pdf' in content_type or response.content[:4] == b'%PDF':
-                        # If the URL doesn't end with .pdf, get filename from parsed URL
-                        if not url.lower().endswith('.pdf'):
-                            parsed_url = urlparse(url)
-                            path_parts = parsed_url.path.split('/')
-                            filename = next((part for part in reversed(path_parts) if part.lower().endswith('.pdf')),
-                                            None)
-                            if not filename:
-                                filename = f"{title}.pdf"
-                        else:
-                            filename = f"{title}.pdf"
+                if probe is not None:
+                    stored_file = self._download_segmented(url, base_headers, part_path, probe)
+                    if stored_file:
+                        object_path, size, sha256 = stored_file
+                        self.metrics.add_transfer(size, time.monotonic() - transfer_started)
+                        self.store.link(object_path, filepath)
+                        print(f"Successfully downloaded PDF to: {filepath}")
+                        return {'path': filepath, 'size': size, 'sha256': sha256,
+                                'etag': probe.headers.get('ETag'),
+                                'last_modified': probe.headers.get('Last-Modified')}
+                    print("Segmented download is not a PDF")
+                    return False
+
+                # Continue a partial download left by an earlier attempt
+                request_headers = dict(headers)
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                if offset:
+                    request_headers['Range'] = f"bytes={offset}-"
+                    validator = self._read_validator(part_path)
+                    if validator:
+                        # The server sends the full file instead if it changed
+                        request_headers['If-Range'] = validator
+
+                # Hold a concurrency slot only while the transfer runs, not while backing off
+                stored_file = None
+                with self.rate_limiter.slot(url):
+                    response = self._request('GET', url, headers=request_headers, stream=True, timeout=30)
+                    if response.status_code in (200, 206):
+                        # Check if content is actually a PDF (by checking Content-Type or first few bytes)
+                        stored_file = self._stream_to_store(response, part_path, offset)
+                    else:
+                        response.close()
+
+                if response.status_code == 304 and stored:
+                    return self._reuse_stored(previous, filepath)
 
-                        # Save the file
-                        filepath = os.path.join(self.download_dir, filename)
-                        with open(filepath, 'wb') as f:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                if chunk:
-                                    f.write(chunk)
+                if response.status_code == 416 and offset:
+                    # Our partial file doesn't fit the remote one any more
+                    print("Partial download is no longer valid, starting over")
+                    self._discard_partial(part_path)
+                    continue
+
+                # Check if the response is valid
+                if response.status_code in (200, 206):
+                    if stored_file:
+                        object_path, size, sha256 = stored_file
+                        # Only the bytes received now count; a resumed file had some already
+                        received = size - offset if response.status_code == 206 else size
+                        self.metrics.add_transfer(received, time.monotonic() - transfer_started)
+                        self.store.link(object_path, filepath)
 
                         print(f"Successfully downloaded PDF to: {filepath}")
-                        return True
+                        return {'path': filepath, 'size': size, 'sha256': sha256,
+                                'etag': response.headers.get('ETag'),
+                                'last_modified': response.headers.get('Last-Modified')}
                     else:
+                        content_type = response.headers.get('Content-Type', '')
                         print(f"Response doesn't appear to be a PDF. Content-Type: {content_type}")
                         if retry_count < max_retries - 1:
                             print(f"Retrying in {retry_delay} seconds...")
                             time.sleep(retry_delay)
                             retry_count += 1
+                            self.metrics.count_retry('download')
                             continue
                         else:
                             print("Maximum retries reached. Could not download PDF.")
@@ -147,10 +583,13 @@ class PDFDownloader:
                     print(f"Failed to download PDF. Status code: {response.status_code}")
                     if response.status_code in [429, 500, 502, 503, 504]:  # Retry on server errors or rate limiting
                         if retry_count < max_retries - 1:
-                            wait_time = retry_delay * (2 ** retry_count)  # Exponential backoff
+                            # Exponential backoff, or longer if the server asks for it
+                            wait_time = max(retry_delay * (2 ** retry_count),
+                                            retry_after_seconds(response.headers) or 0)
                             print(f"Retrying in {wait_time} seconds...")
                             time.sleep(wait_time)
                             retry_count += 1
+                            self.metrics.count_retry('download')
                             continue
                         else:
                             print("Maximum retries reached. Could not download PDF.")
@@ -163,6 +602,7 @@ class PDFDownloader:
                     print(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                     retry_count += 1
+                    self.metrics.count_retry('download')
                     continue
                 else:
                     print("Maximum retries reached. Request timed out repeatedly.")
@@ -175,6 +615,7 @@ class PDFDownloader:
                     print(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                     retry_count += 1
+                    self.metrics.count_retry('download')
                     continue
                 else:
                     print("Maximum retries reached. Connection error persists.")
@@ -187,6 +628,7 @@ class PDFDownloader:
                     print(f"Retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
                     retry_count += 1
+                    self.metrics.count_retry('download')
                     continue
                 else:
                     print("Maximum retries reached. Unexpected error persists.")
@@ -0,0 +1,184 @@
+import os
+import socket
+import threading
+import time
+
+from http_crawler import HTTPGuidanceCrawler
+from pdf_downloader import PDFDownloader
+from page_parsers import ListPageParser
+from work_queue import WorkQueueSink
+
+KINDS = ('page', 'article', 'pdf')
+
+
+class QueueWorker:
+    """Crawls list pages, articles and PDFs leased from a WorkQueue.
+
+    A page item enqueues its articles, an article item enqueues its PDFs and
+    a pdf item downloads one file, so any number of workers, on any number
+    of hosts, share the work at every step. Pages and articles are read
+    over HTTP with Chrome as a fallback, as with the http engine. Each
+    worker keeps its ledger, manifest and files in its own download dir.
+    """
+
+    def __init__(self, queue, base_url, download_dir='downloads', headless=True, kinds=KINDS,
+                 worker_id=None, poll_interval=5, retry_delay=30, browser_profile='default',
+                 rate_limiter=None, site=None, page_url_template=None, layout='flat',
+                 segment_threshold=None, segments=4):
+        """Initialize a worker for the given item kinds."""
+        self.queue = queue
+        self.kinds = tuple(kinds)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval
+        # Failed items come back after this long, giving a struggling site time to recover
+        self.retry_delay = retry_delay
+        self.download_dir = download_dir
+
+        # Resolved PDFs go on the queue instead of being downloaded by the crawler
+        self.sink = WorkQueueSink(queue)
+        self.crawler = HTTPGuidanceCrawler(base_url, download_dir, headless, download_workers=0,
+                                           page_url_template=page_url_template,
+                                           browser_profile=browser_profile,
+                                           rate_limiter=rate_limiter, site=site,
+                                           download_pool=self.sink)
+        self.ledger = self.crawler.ledger
+        self.sink.ledger = self.ledger
+        # Downloads pdf items itself, one at a time
+        self.pdf_downloader = PDFDownloader(None, download_dir, None, self.ledger,
+                                            metrics=self.crawler.metrics,
+                                            rate_limiter=self.crawler.rate_limiter,
+                                            session=self.crawler.session, site=self.crawler.site,
+                                            layout=layout, segment_threshold=segment_threshold,
+                                            segments=segments)
+        self.pdf_downloader.add_listener(self.crawler.manifest.write)
+        self.processed = 0
+
+    def enqueue_pages(self, first_page=1, last_page=None):
+        """Producer: enqueue list pages first_page..last_page (default and at most: all pages)."""
+        self._load_first_page()
+        total_pages = self.crawler._get_total_pages()
+        # Pages past the end would only fail until they are given up on
+        if last_page is None or last_page > total_pages:
+            last_page = total_pages
+        added = sum(self.queue.put('page', {'page': page}, key=f"page:{page}")
+                    for page in range(first_page, last_page + 1))
+        print(f"Enqueued {added} list pages ({first_page}-{last_page})")
+        return added
+
+    def enqueue_articles(self, articles, page=None):
+        """Enqueue article records (dicts with title and url, optionally date and category)."""
+        added = 0
+        for article in articles:
+            payload = {'url': article['url'], 'title': article['title'], 'page': page,
+                       'published': article.get('date'), 'category': article.get('category')}
+            added += self.queue.put('article', payload, key=article['url'])
+        return added
+
+    def start(self):
+        """Process items until the queue has nothing left that another worker could hand back."""
+        print(f"Worker {self.worker_id} processing {', '.join(self.kinds)} items from {self.queue.path}")
+        try:
+            while True:
+                item = self.queue.lease(self.worker_id, self.kinds)
+                if item is None:
+                    if not self.queue.unfinished():
+                        break
+                    # Leased elsewhere; they come back if that worker dies
+                    time.sleep(self.poll_interval)
+                    continue
+                self._process_item(item)
+        finally:
+            print(f"Worker {self.worker_id} processed {self.processed} items; queue: {self.queue.counts()}")
+            self.sink.drain()
+            self.crawler.rate_limiter.report()
+            self.close()
+
+    def close(self):
+        """Close the fallback browser, if one was started, and the crawler."""
+        if self.crawler._browser is not None:
+            print("Closing browser...")
+            self.crawler._browser.tab_pool.close()
+        self.crawler.close()
+
+    def _keep_leased(self, item_id, stop):
+        """Thread body: extend the lease on an item until `stop` is set."""
+        # Renew well before the lease runs out, so a slow job isn't handed to another worker
+        interval = max(1, self.queue.visibility_timeout / 3)
+        while not stop.wait(interval):
+            if not self.queue.extend(item_id, self.worker_id):
+                print(f"Lost the lease on item {item_id}")
+                return
+
+    def _process_item(self, item):
+        """Run one leased item and ack it, or hand it back for a retry."""
+        handlers = {'page': self._process_page, 'article': self._process_article,
+                    'pdf': self._process_pdf}
+        stop = threading.Event()
+        threading.Thread(target=self._keep_leased, args=(item['id'], stop),
+                         name="lease-heartbeat", daemon=True).start()
+        try:
+            ok = handlers[item['kind']](item)
+            error = None if ok else f"{item['kind']} failed"
+        except Exception as e:
+            print(f"Error processing {item['kind']} item {item['id']}: {e}")
+            ok, error = False, str(e)
+        finally:
+            stop.set()
+
+        self.processed += 1
+        if ok:
+            if not self.queue.ack(item['id'], self.worker_id):
+                print(f"Lease on item {item['id']} expired before it finished")
+        else:
+            # Later attempts wait longer, as with the other retries
+            delay = self.retry_delay * (2 ** (item['attempts'] - 1))
+            self.queue.fail(item['id'], self.worker_id, error, delay)
+
+    def _load_first_page(self):
+        """Fetch and parse the first list page once, as HTTPGuidanceCrawler.start() does."""
+        crawler = self.crawler
+        if crawler._first_page is None:
+            html, _ = crawler._fetch(crawler.base_url)
+            if html:
+                crawler._first_page = crawler._parse(ListPageParser(crawler.site), html)
+
+    def _process_page(self, item):
+        """Read the article links of a list page and enqueue them."""
+        page = item['page']
+        print(f"\nProcessing page {page}...")
+        if page == 1:
+            self._load_first_page()
+        links = self.crawler._list_page_links(page)
+        if links is None:
+            print(f"Page {page} not available over HTTP, using the browser")
+            links = self.crawler._browser_page_links(page)
+            if links is None:
+                return False
+
+        added = self.enqueue_articles(links, page)
+        print(f"Found {len(links)} links on page {page}, {added} new")
+        self.ledger.mark_page(page, 'visited', len(links))
+        return True
+
+    def _process_article(self, item):
+        """Resolve the PDFs of an article; they are enqueued as pdf items."""
+        url, title = item['url'], item['title']
+        self.ledger.record_article(url, title, item.get('page'), published=item.get('published'),
+                                   category=item.get('category'))
+        # Clear an earlier failure, so the status below reflects this attempt
+        self.ledger.update_article(url, 'seen')
+        self.crawler._process_link(url, title, item.get('page'))
+        # Its PDFs are downloaded from the queue, whose records don't need the crawler's info
+        self.crawler._article_info.drop(url)
+        article = self.ledger.get_article(url)
+        return article is not None and article['status'] == 'resolved'
+
+    def _process_pdf(self, item):
+        """Download one PDF."""
+        article_url = item.get('article_url')
+        if article_url and self.ledger.get_article(article_url) is None:
+            # Resolved by another worker; the date layout files the PDF by its article's date
+            self.ledger.record_article(article_url, item['title'], item.get('page'),
+                                       published=item.get('published'))
+        return self.pdf_downloader._download_pdf_from_url(item['url'], item['title'],
+                                                         article_url=item.get('article_url'))
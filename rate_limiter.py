@@ -0,0 +1,177 @@
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Responses that mean the host wants us to slow down
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(headers):
+    """Return the delay asked for by a Retry-After header (seconds or HTTP date), or None."""
+    value = (headers or {}).get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostState:
+    """Token bucket and adaptive limits for one host."""
+
+    def __init__(self, rate, burst, concurrency):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.refilled = time.monotonic()
+        self.concurrency = concurrency
+        self.in_flight = 0
+        # No requests before this time (Retry-After)
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.backoffs = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+
+class RateLimiter:
+    """Per-host token bucket with AIMD rate and concurrency, shared by navigations and downloads.
+
+    Every request waits for a token; healthy responses raise the rate (and
+    download concurrency) step by step, while 429s, 5xx and connection
+    errors halve them. A Retry-After header pauses the whole host.
+    """
+
+    def __init__(self, rate=5.0, max_rate=50.0, min_rate=0.5, increase=0.5, concurrency=4,
+                 max_concurrency=16, decrease_interval=1.0):
+        """Set the starting rate (requests/s per host) and the limits AIMD moves between."""
+        self.initial_rate = rate
+        self.max_rate = max(rate, max_rate)
+        self.min_rate = min(rate, min_rate)
+        self.increase = increase
+        self.initial_concurrency = concurrency
+        self.max_concurrency = max(concurrency, max_concurrency)
+        # A burst of failures from requests already in flight only counts once
+        self.decrease_interval = decrease_interval
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    def settings(self):
+        """Return the constructor arguments, to build an equivalent limiter in another process."""
+        return {'rate': self.initial_rate, 'max_rate': self.max_rate, 'min_rate': self.min_rate,
+                'increase': self.increase, 'concurrency': self.initial_concurrency,
+                'max_concurrency': self.max_concurrency, 'decrease_interval': self.decrease_interval}
+
+    def share(self, parts):
+        """Return settings for one of `parts` limiters that together keep to this one's rates.
+
+        For processes that can't share a limiter, e.g. ParallelCrawler's browsers.
+        """
+        settings = self.settings()
+        for name in ('rate', 'max_rate', 'min_rate', 'increase'):
+            settings[name] = settings[name] / parts
+        return settings
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial_rate, max(1.0, self.initial_rate),
+                                                   self.initial_concurrency)
+        return state
+
+    def _take_token(self, state):
+        """Take a token and return 0, or return how long until one may be taken."""
+        now = time.monotonic()
+        state.refill(now)
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        if state.tokens < 1:
+            return (1 - state.tokens) / state.rate
+        state.tokens -= 1
+        state.requests += 1
+        return 0
+
+    def wait(self, url):
+        """Block until the host's bucket has a token and no Retry-After pause is active."""
+        with self._condition:
+            state = self._host(url)
+            while True:
+                delay = self._take_token(state)
+                if not delay:
+                    return
+                self._condition.wait(delay)
+
+    def reserve(self, url):
+        """Non-blocking wait(): take a token and return 0, or return the seconds to wait first.
+
+        For asyncio callers, which sleep on the event loop and ask again.
+        """
+        with self._condition:
+            return self._take_token(self._host(url))
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the host's adaptive concurrency slots (e.g. for one transfer)."""
+        with self._condition:
+            state = self._host(url)
+            while state.in_flight >= int(state.concurrency):
+                self._condition.wait()
+            state.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                state.in_flight -= 1
+                self._condition.notify_all()
+
+    def feedback(self, url, status, retry_after=None):
+        """Adjust the host's limits after a response (status None for a failed connection)."""
+        with self._condition:
+            state = self._host(url)
+            now = time.monotonic()
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+
+            if status is None or status in BACKOFF_STATUSES:
+                state.backoffs += 1
+                if now - state.last_decrease >= self.decrease_interval:
+                    state.last_decrease = now
+                    state.rate = max(self.min_rate, state.rate / 2)
+                    state.concurrency = max(1, state.concurrency / 2)
+                    print(f"Slowing down for {urlsplit(url).netloc}: {state.rate:.2f} requests/s, "
+                          f"{int(state.concurrency)} at a time")
+            elif status < 400:
+                state.rate = min(self.max_rate, state.rate + self.increase)
+                state.concurrency = min(self.max_concurrency, state.concurrency + 1 / state.concurrency)
+            self._condition.notify_all()
+
+    def observe(self, url, response):
+        """Report a requests/HTTP response, honouring its Retry-After header."""
+        self.feedback(url, response.status_code, retry_after_seconds(response.headers))
+
+    def summary(self):
+        """Return the current rate, concurrency and counts per host."""
+        with self._condition:
+            return {host: {'rate': round(state.rate, 2), 'concurrency': int(state.concurrency),
+                           'requests': state.requests, 'backoffs': state.backoffs}
+                    for host, state in self._hosts.items()}
+
+    def report(self):
+        """Print the limits each host ended up with."""
+        summary = self.summary()
+        if not summary:
+            return
+        print("Request rates:")
+        for host, stats in sorted(summary.items()):
+            print(f"  {host}: {stats['requests']} requests, {stats['backoffs']} backoffs, "
+                  f"ended at {stats['rate']:.2f} requests/s and {stats['concurrency']} at a time")
@@ -0,0 +1,125 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from site_profiles import DEFAULT_SITE
+
+# Per-step timeouts in seconds; steps not listed use the default timeout
+DEFAULT_TIMEOUTS = {
+    'initial_load': 30,
+    'refresh': 20,
+    'next_page': 20,
+    'goto_page': 20,
+    'article_load': 15,
+    # Upper bound for pages that never show a PDF link
+    'article': 5,
+}
+
+# True once an article page shows anything we can get a PDF link from
+ARTICLE_READY_SCRIPT = """
+return document.readyState !== 'loading' && (
+    document.getElementById(arguments[0]) !== null ||
+    document.querySelector('[onclick*="' + arguments[1] + '"]') !== null ||
+    document.querySelector('a[href$=".pdf"], a[href$=".PDF"]') !== null);
+"""
+
+
+def _is_stale(element):
+    """Check whether a WebElement has been removed from the page."""
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
+
+class PageReadiness:
+    """Waits for concrete page signals instead of fixed sleeps, and records how long they took."""
+
+    def __init__(self, driver, timeout=15, timeouts=None, poll_frequency=0.2,
+                 ready_states=('complete',), site=DEFAULT_SITE):
+        """Initialize the readiness waits for a driver."""
+        self.driver = driver
+        # Selectors of the list, pagination and PDF markers
+        self.site = site
+        # document.readyState values that count as loaded
+        self.ready_states = ready_states
+        self.timeout = timeout
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.poll_frequency = poll_frequency
+        # Observed wait durations per step, in seconds
+        self.durations = {}
+
+    def _wait(self, step, condition):
+        """Wait until condition(driver) is truthy, recording how long it took."""
+        timeout = self.timeouts.get(step, self.timeout)
+        started = time.monotonic()
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+        finally:
+            self.durations.setdefault(step, []).append(time.monotonic() - started)
+
+    def document_ready(self, step='document_ready'):
+        """Wait for document.readyState to reach one of the ready states."""
+        return self._wait(step, lambda d: d.execute_script("return document.readyState") in self.ready_states)
+
+    def list_loaded(self, step='list'):
+        """Wait for the article list to be present and return it."""
+        return self._wait(step, lambda d: next(iter(d.find_elements(By.CSS_SELECTOR, self.site.list_container)),
+                                               False))
+
+    def list_snapshot(self):
+        """Capture the current list and its first link, to detect when they are replaced."""
+        return (self.driver.find_elements(By.CSS_SELECTOR, self.site.list_container)[:1]
+                + self.driver.find_elements(By.CSS_SELECTOR, self.site.link_selector)[:1])
+
+    def current_page_number(self):
+        """Return the number shown on the highlighted pagination button, or None."""
+        elements = self.driver.find_elements(By.CSS_SELECTOR, self.site.current_page_selector)
+        try:
+            text = elements[0].text.strip() if elements else ''
+        except StaleElementReferenceException:
+            return None
+        return int(text) if text.isdigit() else None
+
+    def page_changed(self, snapshot, expected_page=None, step='next_page'):
+        """Wait until the old list was replaced or the pagination shows expected_page."""
+
+        def changed(driver):
+            if expected_page is not None and self.current_page_number() == expected_page:
+                return True
+            return any(_is_stale(element) for element in snapshot)
+
+        self._wait(step, changed)
+        return self.list_loaded(step=f"{step}_list")
+
+    def on_page(self, page, step='goto_page'):
+        """Wait until the pagination shows the given page number."""
+        return self._wait(step, lambda d: self.current_page_number() == page)
+
+    def article_ready(self, step='article'):
+        """Wait until an article page exposes its PDF link, or give up quietly."""
+        try:
+            self.document_ready(f"{step}_load")
+            return self._wait(step, lambda d: d.execute_script(ARTICLE_READY_SCRIPT, self.site.file_prefix_id,
+                                                               self.site.pdf_function))
+        except TimeoutException:
+            # Pages without a PDF never show the markers; let the downloader report it
+            return False
+
+    def summary(self):
+        """Return count, mean and max wait per step."""
+        return {step: {'count': len(waits),
+                       'mean': sum(waits) / len(waits),
+                       'max': max(waits)}
+                for step, waits in self.durations.items() if waits}
+
+    def report(self):
+        """Print the observed wait durations."""
+        summary = self.summary()
+        if not summary:
+            return
+        print("Observed page waits:")
+        for step, stats in sorted(summary.items()):
+            print(f"  {step}: {stats['count']} waits, mean {stats['mean']:.2f}s, max {stats['max']:.2f}s")
@@ -1,13 +1,19 @@
-from main_crawler import GuidanceCrawler
+from http_crawler import HTTPGuidanceCrawler
+from multi_site_crawler import MultiSiteCrawler
+from site_profiles import get_profile, load_profiles
+from work_queue import WorkQueue
+from queue_worker import QueueWorker, KINDS
+from rate_limiter import RateLimiter
 import argparse
 import sys
 
 
-def check_requirements():
-    """Check if required packages are installed."""
+def check_requirements(browser=True):
+    """Check if required packages are installed (selenium only when Chrome is needed up front)."""
     try:
-        import selenium
         import requests
+        if browser:
+            import selenium
     except ImportError as e:
         print(f"Missing required package: {e}")
         print("Please install required packages using:")
@@ -15,9 +21,20 @@ def check_requirements():
         sys.exit(1)
 
 
-def main():
-    check_requirements()
+def limit_pages(crawler, max_page):
+    """Stop a crawler at max_page by wrapping its total page count."""
+    # Store the original method
+    original_get_total_pages = crawler._get_total_pages
+
+    # Define a new method that limits the pages
+    def limited_get_total_pages():
+        return min(original_get_total_pages(), max_page)
+
+    # Replace the method
+    crawler._get_total_pages = limited_get_total_pages
+
 
+def main():
     parser = argparse.ArgumentParser(description='Crawl medical guidance website for PDFs.')
     parser.add_argument('--url', type=str,
                         default='https://example.com/path/to/guidance/page',
@@ -28,34 +45,190 @@ def main():
                         help='Maximum number of pages to crawl (default: all pages)')
     parser.add_argument('--download-dir', type=str, default='downloads',
                         help='Directory to save downloaded PDFs')
+    parser.add_argument('--download-workers', type=int, default=None,
+                        help='Parallel PDF downloads to start with, raised while the site responds well '
+                             '(default 4; 0 downloads one at a time)')
+    parser.add_argument('--max-download-workers', type=int, default=16,
+                        help='Most parallel PDF downloads per host that --download-workers may rise to')
+    parser.add_argument('--engine', choices=['browser', 'http'], default=None,
+                        help='Crawl with Chrome (default), or over plain HTTP with Chrome only as a fallback')
+    parser.add_argument('--page-url-template', type=str, default=None,
+                        help='List page URL with a {page} placeholder, used by the http engine')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue a previous crawl: skip completed pages and PDFs, retry failures')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch new articles: stop at the first page with nothing new')
+    parser.add_argument('--browsers', type=int, default=1,
+                        help='Split the pages across this many browser processes (browser engine)')
+    parser.add_argument('--browser-profile', choices=['default', 'lean'], default='default',
+                        help='lean skips images, stylesheets, fonts and analytics for faster page loads')
+    parser.add_argument('--progress-interval', type=float, default=None,
+                        help='Print a progress line every N seconds')
+    parser.add_argument('--rate', type=float, default=5.0,
+                        help='Requests per second to start with, per host')
+    parser.add_argument('--max-rate', type=float, default=50.0,
+                        help='Upper limit for the request rate while responses stay healthy')
+    parser.add_argument('--index', action='store_true',
+                        help='Extract the text of each downloaded PDF into a search index (needs pypdf)')
+    parser.add_argument('--site', action='append', default=[],
+                        help='Site profile to crawl; repeat to crawl several sites at once (http engine)')
+    parser.add_argument('--site-config', type=str, default=None,
+                        help='JSON file with extra site profiles')
+    parser.add_argument('--queue', type=str, default=None,
+                        help='Work queue file shared by workers; without --enqueue, run a worker on it')
+    parser.add_argument('--enqueue', action='store_true',
+                        help='Add the list pages from --start-page (up to --max-pages) to the --queue and exit')
+    parser.add_argument('--lease-timeout', type=float, default=600,
+                        help='Seconds before the items of a worker that stopped responding are handed out again')
+    parser.add_argument('--queue-kinds', type=str, default=','.join(KINDS),
+                        help='Comma-separated item kinds this worker handles (page, article, pdf)')
+    parser.add_argument('--layout', choices=['flat', 'hash', 'date'], default='flat',
+                        help='Where PDFs go: the download folder itself, or subfolders by URL hash or publication month')
+    parser.add_argument('--segment-threshold', type=int, default=None,
+                        help='Download PDFs of at least this many bytes as parallel byte ranges '
+                             '(default: never)')
+    parser.add_argument('--segments', type=int, default=4,
+                        help='Parallel byte ranges per segmented download')
+    parser.add_argument('--debugger-address', type=str, default=None,
+                        help='Attach to a running Chrome started with --remote-debugging-port (host:port)')
+    parser.add_argument('--user-data-dir', type=str, default=None,
+                        help='Chrome profile directory kept between runs, for a warm cache and cookies')
 
     args = parser.parse_args()
+    if args.enqueue and not args.queue:
+        parser.error("--enqueue needs --queue")
+    if args.queue:
+        # Queue workers crawl one site over HTTP, one item at a time, and retry through the queue
+        ignored = [option for option, value in (('--resume', args.resume),
+                                                ('--incremental', args.incremental),
+                                                ('--download-workers', args.download_workers is not None),
+                                                ('--engine browser', args.engine == 'browser'),
+                                                ('--browsers', args.browsers > 1),
+                                                ('--progress-interval', args.progress_interval),
+                                                ('--debugger-address', args.debugger_address),
+                                                ('--user-data-dir', args.user_data_dir)) if value]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} can't be combined with --queue")
+        if len(args.site) > 1:
+            parser.error("--queue crawls a single --site")
+    args.engine = args.engine or 'browser'
+    if args.download_workers is None:
+        args.download_workers = 4
+    if args.browsers > 1:
+        if args.engine == 'http':
+            parser.error("--browsers only applies to the browser engine")
+        # Each worker process starts its own fresh Chrome on the default site
+        ignored = [option for option, value in (('--incremental', args.incremental),
+                                                ('--site', args.site),
+                                                ('--debugger-address', args.debugger_address),
+                                                ('--user-data-dir', args.user_data_dir)) if value]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} can't be combined with --browsers")
+    # The http engine, queue workers and multi-site crawls start Chrome only as a fallback
+    check_requirements(browser=args.engine == 'browser' and not args.queue and len(args.site) < 2)
+    rate_limiter = RateLimiter(args.rate, max_rate=args.max_rate,
+                               concurrency=max(1, min(args.download_workers, args.max_download_workers)),
+                               max_concurrency=max(1, args.max_download_workers))
+    if args.site_config:
+        load_profiles(args.site_config)
+    sites = [get_profile(name) for name in args.site]
+    site = sites[0] if len(sites) == 1 else None
+    if site is not None and site.base_url:
+        args.url = site.base_url
 
-    print("Starting crawler in headless mode")
-    print(f"Target URL: {args.url}")
+    print(f"Starting crawler in headless mode ({args.engine} engine)")
+    if len(sites) > 1:
+        print(f"Target sites: {', '.join(profile.name for profile in sites)}")
+    else:
+        print(f"Target URL: {args.url}")
     print(f"Starting page: {args.start_page}")
     if args.max_pages:
         print(f"Maximum pages to crawl: {args.max_pages}")
 
-    crawler = GuidanceCrawler(args.url)
-    crawler.current_page = args.start_page
-
-    # Set max pages if specified
-    if args.max_pages:
-        # Store the original method
-        original_get_total_pages = crawler._get_total_pages
+    if args.queue:
+        work_queue = WorkQueue(args.queue, visibility_timeout=args.lease_timeout)
+        worker = QueueWorker(work_queue, args.url, download_dir=args.download_dir,
+                             kinds=args.queue_kinds.split(','),
+                             page_url_template=args.page_url_template, layout=args.layout,
+                             segment_threshold=args.segment_threshold, segments=args.segments,
+                             browser_profile=args.browser_profile,
+                             rate_limiter=rate_limiter, site=site)
+        if args.enqueue:
+            last_page = args.start_page + args.max_pages - 1 if args.max_pages else None
+            try:
+                worker.enqueue_pages(args.start_page, last_page)
+            finally:
+                worker.close()
+                work_queue.close()
+            return
+        crawler = worker
+    elif len(sites) > 1:
+        crawler = MultiSiteCrawler(sites, download_dir=args.download_dir,
+                                   download_workers=args.download_workers,
+                                   resume=args.resume, incremental=args.incremental,
+                                   browser_profile=args.browser_profile,
+                                   progress_interval=args.progress_interval,
+                                   rate_limiter=rate_limiter, layout=args.layout,
+                                   segment_threshold=args.segment_threshold, segments=args.segments)
+    elif args.engine == 'http':
+        crawler = HTTPGuidanceCrawler(args.url, download_dir=args.download_dir,
+                                      download_workers=args.download_workers,
+                                      page_url_template=args.page_url_template,
+                                      resume=args.resume, incremental=args.incremental,
+                                      browser_profile=args.browser_profile,
+                                      progress_interval=args.progress_interval,
+                                      rate_limiter=rate_limiter, site=site,
+                                      debugger_address=args.debugger_address,
+                                      user_data_dir=args.user_data_dir, layout=args.layout,
+                                      segment_threshold=args.segment_threshold, segments=args.segments)
+    elif args.browsers > 1:
+        from parallel_crawler import ParallelCrawler
+        crawler = ParallelCrawler(args.url, download_dir=args.download_dir, browsers=args.browsers,
+                                  download_workers=args.download_workers, resume=args.resume,
+                                  browser_profile=args.browser_profile,
+                                  progress_interval=args.progress_interval,
+                                  rate_limiter=rate_limiter, layout=args.layout,
+                                  segment_threshold=args.segment_threshold, segments=args.segments)
+    else:
+        from main_crawler import GuidanceCrawler
+        crawler = GuidanceCrawler(args.url, download_dir=args.download_dir,
+                                  download_workers=args.download_workers,
+                                  resume=args.resume, incremental=args.incremental,
+                                  browser_profile=args.browser_profile,
+                                  progress_interval=args.progress_interval,
+                                  rate_limiter=rate_limiter, site=site,
+                                  debugger_address=args.debugger_address,
+                                  user_data_dir=args.user_data_dir, layout=args.layout,
+                                  segment_threshold=args.segment_threshold, segments=args.segments)
+    # Each site of a multi-site crawl has its own crawler
+    site_crawlers = getattr(crawler, 'crawlers', [crawler])
+    for site_crawler in site_crawlers:
+        # Queue workers take their pages from the queue
+        if args.queue:
+            break
+        site_crawler.current_page = args.start_page
 
-        # Define a new method that limits the pages
-        def limited_get_total_pages():
-            original_total = original_get_total_pages()
-            max_page = args.start_page + args.max_pages - 1
-            return min(original_total, max_page)
+        # Set max pages if specified
+        if args.max_pages:
+            limit_pages(site_crawler, args.start_page + args.max_pages - 1)
 
-        # Replace the method
-        crawler._get_total_pages = limited_get_total_pages
+    # Index PDF text as downloads finish; search it with search_pdfs.py
+    indexers = []
+    if args.index:
+        from search_index import TextIndexer
+        for site_crawler in site_crawlers:
+            indexer = TextIndexer(site_crawler.download_dir, site_crawler.ledger)
+            site_crawler.pdf_downloader.add_listener(indexer.submit)
+            indexers.append(indexer)
 
     # Start the crawler
-    crawler.start()
+    try:
+        crawler.start()
+    finally:
+        for indexer in indexers:
+            indexer.close()
+        if args.queue:
+            work_queue.close()
 
 
 if __name__ == "__main__":
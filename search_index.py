@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # Optional: only needed to build the index
+    PdfReader = None
+
+INDEX_FILENAME = "search_index.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    pdf_url TEXT UNIQUE NOT NULL,
+    sha256 TEXT,
+    path TEXT,
+    title TEXT,
+    article_url TEXT,
+    page INTEGER,
+    size INTEGER,
+    pdf_pages INTEGER,
+    indexed_at REAL
+);
+"""
+
+# Trigram tokens let Chinese text, which has no spaces, be searched by substring
+FTS_TABLE = "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, body, tokenize='{tokenizer}')"
+
+
+def extract_text(path):
+    """Return (text, page count) of a PDF. Runs in a worker process."""
+    reader = PdfReader(path)
+    pages = [page.extract_text() or '' for page in reader.pages]
+    return '\n'.join(pages), len(pages)
+
+
+class SearchIndex:
+    """Full-text index of downloaded PDFs, kept in the download dir next to the ledger."""
+
+    def __init__(self, download_dir="downloads", filename=INDEX_FILENAME):
+        """Open (or create) the index."""
+        self.path = os.path.join(download_dir, filename)
+        self._lock = threading.Lock()
+        # Written from the extraction callbacks, read from the main thread
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.execute(FTS_TABLE.format(tokenizer='trigram'))
+            self.min_query_length = 3
+        except sqlite3.OperationalError:
+            # SQLite before 3.34 has no trigram tokenizer
+            self._conn.execute(FTS_TABLE.format(tokenizer='unicode61'))
+            self.min_query_length = 1
+        self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def is_current(self, pdf_url, sha256):
+        """Check whether a PDF is already indexed with this content."""
+        with self._lock:
+            row = self._conn.execute("SELECT sha256 FROM documents WHERE pdf_url = ?",
+                                     (pdf_url,)).fetchone()
+        return row is not None and row[0] == sha256
+
+    def add(self, document, text, pdf_pages):
+        """Store (or replace) the text and metadata of a PDF."""
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM documents WHERE pdf_url = ?",
+                                     (document['pdf_url'],)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+            self._conn.execute(
+                "INSERT INTO documents (pdf_url, sha256, path, title, article_url, page, size, "
+                "pdf_pages, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(pdf_url) DO UPDATE SET sha256=excluded.sha256, path=excluded.path, "
+                "title=excluded.title, article_url=excluded.article_url, page=excluded.page, "
+                "size=excluded.size, pdf_pages=excluded.pdf_pages, indexed_at=excluded.indexed_at",
+                (document['pdf_url'], document.get('sha256'), document.get('path'),
+                 document.get('title'), document.get('article_url'), document.get('page'),
+                 document.get('size'), pdf_pages, time.time()))
+            document_id = self._conn.execute("SELECT id FROM documents WHERE pdf_url = ?",
+                                             (document['pdf_url'],)).fetchone()[0]
+            self._conn.execute("INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+                               (document_id, document.get('title') or '', text))
+            self._conn.commit()
+
+    def search(self, query, limit=20):
+        """Return the best matches for a phrase as dicts with a text snippet."""
+        query = query.strip()
+        if not query:
+            return []
+        columns = ("d.title, d.page, d.path, d.article_url, d.pdf_url, "
+                   "snippet(documents_fts, 1, '[', ']', '...', 40) AS snippet")
+        if len(query) >= self.min_query_length:
+            sql = (f"SELECT {columns} FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                   f"WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?")
+            params = ('"' + query.replace('"', '""') + '"', limit)
+        else:
+            # Too short for trigrams; scan instead
+            like = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            sql = (f"SELECT {columns} FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                   f"WHERE documents_fts.title LIKE ? ESCAPE '\\' OR documents_fts.body LIKE ? ESCAPE '\\' "
+                   f"LIMIT ?")
+            params = (like, like, limit)
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+class TextIndexer:
+    """Extracts text from downloaded PDFs in a process pool and adds it to the SearchIndex.
+
+    Register `submit` as a PDFDownloader listener; unchanged files are skipped.
+    """
+
+    def __init__(self, download_dir="downloads", ledger=None, workers=2):
+        """Open the index; `ledger` supplies the list page of each article."""
+        if PdfReader is None:
+            raise RuntimeError("Text extraction needs pypdf: pip install pypdf")
+        self.index = SearchIndex(download_dir)
+        self.ledger = ledger
+        self._executor = ProcessPoolExecutor(max_workers=max(1, workers))
+        self.indexed = 0
+        self.failed = 0
+
+    def submit(self, record):
+        """Queue a finished download for extraction, unless it is already indexed."""
+        if record.get('status') != 'done' or not record.get('path'):
+            return
+        if self.index.is_current(record['pdf_url'], record.get('sha256')):
+            return
+
+        document = dict(record)
+        if self.ledger is not None and record.get('article_url'):
+            article = self.ledger.get_article(record['article_url'])
+            if article:
+                document['page'] = article['page']
+                document['title'] = article['title'] or document.get('title')
+
+        future = self._executor.submit(extract_text, record['path'])
+        future.add_done_callback(lambda done: self._store(done, document))
+
+    def _store(self, future, document):
+        """Write the extracted text to the index."""
+        try:
+            text, pdf_pages = future.result()
+            self.index.add(document, text, pdf_pages)
+            self.indexed += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"Could not index {document.get('path')}: {e}")
+
+    def index_downloads(self):
+        """Queue every PDF the ledger lists as downloaded, e.g. files from runs before indexing."""
+        for document in self.ledger.downloaded_documents():
+            if document['path'] and os.path.exists(document['path']):
+                self.submit(dict(document, status='done'))
+
+    def close(self):
+        """Wait for queued extractions, then close the index."""
+        # Results are stored by callbacks that run before shutdown returns
+        self._executor.shutdown(wait=True)
+        print(f"Search index: {self.indexed} PDFs indexed, {self.failed} failed")
+        self.index.close()
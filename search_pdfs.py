@@ -0,0 +1,53 @@
+import argparse
+import sys
+
+from search_index import SearchIndex, TextIndexer
+from crawl_ledger import CrawlLedger
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the text of downloaded guideline PDFs')
+    parser.add_argument('query', nargs='?', default=None,
+                        help='Phrase to look for, e.g. "胆管炎"')
+    parser.add_argument('--download-dir', type=str, default='downloads',
+                        help='Folder the crawler downloaded to')
+    parser.add_argument('--limit', type=int, default=20,
+                        help='Maximum number of results')
+    parser.add_argument('--build', action='store_true',
+                        help='First index downloaded PDFs that are new or changed since the last build')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Processes extracting text while building')
+    args = parser.parse_args()
+
+    if args.build:
+        ledger = CrawlLedger(args.download_dir)
+        try:
+            indexer = TextIndexer(args.download_dir, ledger, workers=args.workers)
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        indexer.index_downloads()
+        indexer.close()
+        ledger.close()
+
+    if not args.query:
+        if not args.build:
+            parser.print_help()
+        return
+
+    index = SearchIndex(args.download_dir)
+    results = index.search(args.query, args.limit)
+    index.close()
+
+    if not results:
+        print("No matches")
+        return
+    for i, result in enumerate(results, 1):
+        page = f" (list page {result['page']})" if result['page'] else ""
+        print(f"{i}. {result['title']}{page}")
+        print(f"   {result['path']}")
+        print(f"   {' '.join(result['snippet'].split())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import json
+from urllib.parse import urlsplit
+
+
+class SiteProfile:
+    """Where a journal site keeps its article links, pagination and PDF references.
+
+    The defaults describe the original journal (lcgdbzz.org); other sites
+    override only what differs. Selectors are CSS; the HTTP parsers
+    understand the subset used here (tag#id.class compounds separated by
+    spaces).
+    """
+
+    FIELDS = {
+        'name': 'lcgdbzz',
+        'base_url': None,
+        # List pages
+        'list_container': '#topdownlist',
+        'link_selector': '#topdownlist li.listp a',
+        'item_selector': 'li.listp',
+        'page_count_selector': '.pageTagLiInfo.info.gong',
+        'current_page_selector': 'li.clickpage.current',
+        'next_selector': 'li.clickpage.next',
+        'first_selector': 'li.clickpage.first',
+        'last_selector': 'li.clickpage.last',
+        # JavaScript that jumps to a list page
+        'goto_page_script': 'gotopage({page});',
+        # e.g. "https://example.com/list?page={page}" for the http engine
+        'page_url_template': None,
+        # Article pages: id of the input holding the file URL prefix, and the download function
+        'file_prefix_id': 'fileurls',
+        'pdf_function': 'downpdfbyname',
+        'default_file_prefix': '/fileLCGDBZZ/',
+        # Plain links to .pdf files count only if their text has one of these words
+        'pdf_link_words': ('PDF', '下载', 'Download'),
+        # The site root is the part of an article URL before this marker
+        'article_path_marker': '/custom/',
+    }
+
+    def __init__(self, **settings):
+        """Create a profile; unknown settings are rejected to catch typos in config files."""
+        unknown = set(settings) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown site profile settings: {', '.join(sorted(unknown))}")
+        for field, default in self.FIELDS.items():
+            setattr(self, field, settings.get(field, default))
+
+    def to_dict(self):
+        """Return the settings as a plain dict."""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self):
+        return f"SiteProfile(name={self.name!r}, base_url={self.base_url!r})"
+
+
+DEFAULT_SITE = SiteProfile(base_url='https://www.lcgdbzz.org/custom/showZNGS')
+
+# Registered profiles by name
+SITE_PROFILES = {DEFAULT_SITE.name: DEFAULT_SITE}
+
+
+def register_profile(profile):
+    """Add (or replace) a profile in the registry and return it."""
+    SITE_PROFILES[profile.name] = profile
+    return profile
+
+
+def load_profiles(path):
+    """Register the profiles in a JSON file (a list of settings objects) and return them."""
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    if isinstance(entries, dict):
+        entries = [entries]
+    return [register_profile(SiteProfile(**entry)) for entry in entries]
+
+
+def get_profile(name):
+    """Return a registered profile by name."""
+    try:
+        return SITE_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown site profile: {name} (known: {', '.join(sorted(SITE_PROFILES))})")
+
+
+def profile_for_url(url):
+    """Return the registered profile for the URL's host, or the default profile."""
+    host = urlsplit(url or '').netloc
+    for profile in SITE_PROFILES.values():
+        if profile.base_url and urlsplit(profile.base_url).netloc == host:
+            return profile
+    return DEFAULT_SITE
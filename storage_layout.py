@@ -0,0 +1,105 @@
+import hashlib
+import os
+import re
+import threading
+
+LAYOUTS = ('flat', 'hash', 'date')
+
+# Most filesystems allow 255 bytes per name; leave room for a collision suffix
+MAX_NAME_BYTES = 200
+
+
+def limit_utf8(text, max_bytes):
+    """Cut text to at most max_bytes of UTF-8 without splitting a character."""
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode('utf-8', errors='ignore').rstrip()
+
+
+def url_key(url):
+    """Return a stable hex digest of a URL, used for hash shards and collision suffixes."""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class StorageLayout:
+    """Decides where each PDF appears under its readable name, and remembers it.
+
+    'flat' keeps every file in the download dir, 'hash' spreads them over
+    256 subdirectories by URL hash, and 'date' files them under the
+    article's publication year and month. Two PDFs that would get the same
+    name keep both: the later one gets a short URL hash appended. Claimed
+    paths are indexed in memory, loaded from the ledger's downloads (or one
+    directory walk without a ledger); a path the index doesn't know is
+    checked on disk once, for files left by runs before the ledger.
+    """
+
+    def __init__(self, download_dir="downloads", ledger=None, layout='flat', max_name_bytes=MAX_NAME_BYTES):
+        """Set up the layout; the index of paths in use is built on first use."""
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown storage layout: {layout}")
+        self.download_dir = download_dir
+        self.ledger = ledger
+        self.layout = layout
+        self.max_name_bytes = max_name_bytes
+        self._lock = threading.Lock()
+        # pdf_url -> path, and path -> pdf_url (None for files of unknown origin)
+        self._paths = {}
+        self._owners = {}
+        self._loaded = False
+
+    def _load(self):
+        """Index the files earlier runs put in the download dir."""
+        if self.ledger is not None:
+            for pdf_url, path in self.ledger.download_paths():
+                self._paths[pdf_url] = path
+                self._owners[os.path.normcase(path)] = pdf_url
+            return
+        for root, dirs, files in os.walk(self.download_dir):
+            # Skip the content store's objects and partial files
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for name in files:
+                if name.lower().endswith('.pdf'):
+                    self._owners[os.path.normcase(os.path.join(root, name))] = None
+
+    def path_for(self, pdf_url, filename, article_url=None):
+        """Return the path for a PDF, the same one every time for the same URL."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            path = self._paths.get(pdf_url)
+            if path is not None:
+                return path
+
+            stem, ext = os.path.splitext(filename)
+            stem = limit_utf8(stem, self.max_name_bytes) or 'download'
+            directory = os.path.join(self.download_dir, self._shard(pdf_url, article_url))
+            path = os.path.join(directory, f"{stem}{ext}")
+            key = os.path.normcase(path)
+            if key in self._owners:
+                owner = self._owners[key]
+            else:
+                # Not claimed by any PDF we know of, but a file may be there already
+                owner = None if os.path.lexists(path) else pdf_url
+            if owner != pdf_url:
+                # Taken by another PDF (or an untracked file): keep both
+                path = os.path.join(directory, f"{stem} [{url_key(pdf_url)[:8]}]{ext}")
+
+            os.makedirs(directory, exist_ok=True)
+            self._paths[pdf_url] = path
+            self._owners[os.path.normcase(path)] = pdf_url
+            return path
+
+    def _shard(self, pdf_url, article_url):
+        """Return the subdirectory a PDF goes in ('' for the flat layout)."""
+        if self.layout == 'hash':
+            return url_key(pdf_url)[:2]
+        if self.layout == 'date':
+            article = self.ledger.get_article(article_url) if self.ledger and article_url else None
+            # e.g. 2025-03-01, 2025.3.1 or 2025年3月1日
+            match = re.match(r'(\d{4})\D+(\d{1,2})', (article or {}).get('published') or '')
+            if match:
+                return os.path.join(match.group(1), match.group(2).zfill(2))
+            return 'undated'
+        return ''
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+QUEUE_FILENAME = "work_queue.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status, kind);
+"""
+
+
+class WorkQueue:
+    """Work queue of list pages, articles and PDFs with leases, kept in a SQLite file.
+
+    A worker leases an item, processes it and acks it. Leases expire after
+    `visibility_timeout` seconds, so the items of a worker that died are
+    handed out again; a live worker extends the lease of a long job while it
+    runs. After `max_attempts` leases an item is marked dead.
+    Items with a key are enqueued once per queue file.
+
+    SQLite serves workers on one host, or on several hosts that share the
+    file over a filesystem with working locks. Another backend only needs
+    the same put/lease/extend/ack/fail/counts methods.
+    """
+
+    def __init__(self, path=QUEUE_FILENAME, visibility_timeout=600, max_attempts=5):
+        """Open (or create) the queue."""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Autocommit, so lease() can take the write lock itself with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def put(self, kind, payload, key=None):
+        """Enqueue an item; returns False if an item with the same key was enqueued before."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO items (kind, key, payload, status, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?)",
+                (kind, key, json.dumps(payload, ensure_ascii=False), time.time()))
+            return cursor.rowcount == 1
+
+    def lease(self, worker, kinds=None):
+        """Take the oldest available item for `worker`, or return None if there is none.
+
+        The item is returned as a dict with id, kind, attempts and the payload.
+        """
+        kinds = list(kinds or [])
+        kind_filter = f"AND kind IN ({','.join('?' * len(kinds))}) " if kinds else ""
+        with self._lock:
+            while True:
+                now = time.time()
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute(
+                        "SELECT id, kind, payload, attempts FROM items "
+                        "WHERE (status = 'queued' OR (status = 'leased' AND lease_until < ?)) "
+                        f"{kind_filter}ORDER BY id LIMIT 1", [now] + kinds).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    item_id, kind, payload, attempts = row
+                    if attempts >= self.max_attempts:
+                        # Leased too often without an ack, e.g. it keeps killing workers
+                        self._conn.execute(
+                            "UPDATE items SET status = 'dead', worker = NULL, "
+                            "error = COALESCE(error, 'lease expired'), updated_at = ? WHERE id = ?",
+                            (now, item_id))
+                        self._conn.execute("COMMIT")
+                        continue
+
+                    self._conn.execute(
+                        "UPDATE items SET status = 'leased', worker = ?, lease_until = ?, "
+                        "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (worker, now + self.visibility_timeout, now, item_id))
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                return dict(json.loads(payload), id=item_id, kind=kind, attempts=attempts + 1)
+
+    def extend(self, item_id, worker):
+        """Renew a lease for another `visibility_timeout`; returns False if it was lost."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (now + self.visibility_timeout, now, item_id, worker))
+            return cursor.rowcount == 1
+
+    def ack(self, item_id, worker):
+        """Mark a leased item as done; returns False if the lease was lost to another worker."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET status = 'done', lease_until = NULL, error = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), item_id, worker))
+            return cursor.rowcount == 1
+
+    def fail(self, item_id, worker, error, delay=0):
+        """Give a leased item back after a failure, to be retried after `delay` seconds."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'leased' END, "
+                "lease_until = ?, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, now + delay, error, now, item_id, worker))
+            return cursor.rowcount == 1
+
+    def counts(self):
+        """Return the number of items per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall()
+        return dict(rows)
+
+    def unfinished(self):
+        """Return the number of items that are queued or leased."""
+        counts = self.counts()
+        return counts.get('queued', 0) + counts.get('leased', 0)
+
+
+class WorkQueueSink:
+    """Stand-in for DownloadPool that enqueues PDF downloads on a WorkQueue.
+
+    Like QueueSink, it receives the downloader's bound method and forwards
+    only the (url, title, article_url) arguments. With a ledger, the item
+    also carries the article's list page and publication date, which the
+    worker that downloads it may not have seen.
+    """
+
+    def __init__(self, queue, ledger=None):
+        """Initialize the sink with a WorkQueue and optionally the ledger of the articles."""
+        self.queue = queue
+        self.ledger = ledger
+        self.submitted = 0
+
+    def submit(self, func, url, title, article_url=None):
+        """Enqueue a PDF download, once per URL."""
+        payload = {'url': url, 'title': title, 'article_url': article_url}
+        article = self.ledger.get_article(article_url) if self.ledger is not None and article_url else None
+        if article is not None:
+            payload.update(page=article['page'], published=article['published'])
+        if self.queue.put('pdf', payload, key=url):
+            self.submitted += 1
+        return True
+
+    def drain(self):
+        """Nothing to wait for; queue workers do the downloads."""
+        print(f"Enqueued {self.submitted} PDF downloads")